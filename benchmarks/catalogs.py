@@ -0,0 +1,84 @@
+"""
+Synthetic movie catalogs for benchmarks.
+
+Titles mix a few real-looking patterns with numbered sequels so searches hit
+both the substring and the fuzzy path. Generated files are reused while the
+row count and seed match, large ODS sheets take a while to write.
+"""
+
+import os
+import random
+from typing import List
+
+from movie_manager.models import Movie
+from movie_manager.storage import MovieStorage, OdsStorage, SqliteStorage
+
+ERAS = ["Showa", "Heisei", "Millennium", "Reiwa", "MonsterVerse"]
+SUBJECTS = [
+    "Godzilla",
+    "Mothra",
+    "King Ghidorah",
+    "Rodan",
+    "Mechagodzilla",
+    "Gamera",
+    "Biollante",
+    "Destoroyah",
+    "Anguirus",
+    "Hedorah",
+]
+PATTERNS = [
+    "{a}",
+    "{a} vs. {b}",
+    "Return of {a}",
+    "{a} Raids Again",
+    "Son of {a}",
+    "Terror of {a}",
+    "{a}, {b} and {c}: Giant Monsters All-Out Attack",
+    "Invasion of {a}",
+]
+
+
+def make_movies(rows: int, seed: int = 0) -> List[Movie]:
+    rng = random.Random(seed)
+    movies = []
+    for i in range(rows):
+        a, b, c = rng.sample(SUBJECTS, 3)
+        title = rng.choice(PATTERNS).format(a=a, b=b, c=c)
+        # Number the repeats so every (title, year) stays unique
+        movies.append(
+            Movie(
+                title=(
+                    f"{title} {i // len(PATTERNS) + 1}" if i >= len(PATTERNS) else title
+                ),
+                year=1954 + i % 70,
+                own=rng.choice(["Yes", "No"]),
+                era=ERAS[i % len(ERAS)],
+                description=f"Synthetic movie {i}",
+            )
+        )
+    return movies
+
+
+def catalog_path(workdir: str, backend: str, rows: int, seed: int = 0) -> str:
+    ext = "ods" if backend == "ods" else "sqlite3"
+    return os.path.join(workdir, f"catalog-{rows}-{seed}.{ext}")
+
+
+def build_storage(
+    workdir: str, backend: str, rows: int, seed: int = 0, rebuild: bool = False
+) -> MovieStorage:
+    """
+    Open (and generate on first use) a synthetic catalog of `rows` movies.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    path = catalog_path(workdir, backend, rows, seed)
+    if rebuild and os.path.exists(path):
+        os.remove(path)
+
+    fresh = not os.path.exists(path)
+    storage: MovieStorage = (
+        OdsStorage(path, "Movie List") if backend == "ods" else SqliteStorage(path)
+    )
+    if fresh:
+        storage.bulk_upsert(make_movies(rows, seed))
+    return storage
@@ -0,0 +1,126 @@
+"""
+Microbenchmark for TMDbBase.parse_movie_credits.
+
+Compares the current parser (heap top-N, single pass over the raw crew,
+slotted models) against the previous approach, which built a dataclass for
+every cast and crew entry, fully sorted the cast and filtered the crew twice.
+
+    python -m benchmarks.credits_parse [--cast 300] [--crew 600] [--runs 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+os.environ.setdefault("TMDB_ACCESS", "benchmark")
+
+from utils.tmdb.tmdb_api import TMDbBase  # noqa: E402
+
+DEPARTMENTS = [
+    ("Directing", "Director"),
+    ("Directing", "Assistant Director"),
+    ("Writing", "Screenplay"),
+    ("Sound", "Original Music Composer"),
+    ("Camera", "Director of Photography"),
+    ("Visual Effects", "VFX Artist"),
+    ("Art", "Production Design"),
+    ("Crew", "Stunts"),
+]
+
+
+def make_credits(cast: int, crew: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    orders = list(range(cast))
+    rng.shuffle(orders)
+    return {
+        "cast": [
+            {"name": f"Actor {i}", "character": f"Role {i}", "order": o}
+            for i, o in enumerate(orders)
+        ],
+        "crew": [
+            {"name": f"Crew {i}", "department": d, "job": j}
+            for i, (d, j) in enumerate(rng.choice(DEPARTMENTS) for _ in range(crew))
+        ],
+    }
+
+
+# ---- The previous implementation, kept here as the baseline ---- #
+@dataclass
+class _OldCrew:
+    name: str = ""
+    job: str = ""
+    department: str = ""
+
+
+@dataclass
+class _OldCast:
+    name: str = ""
+    character: str = ""
+    order: int = 999
+
+
+def old_parse(credits: Dict[str, Any], top_n: int = 5):
+    clean_cast = [
+        _OldCast(c.get("name", ""), c.get("character", ""), c.get("order", 999))
+        for c in credits.get("cast") or []
+        if isinstance(c, dict) and "name" in c
+    ]
+    clean_crew: List[_OldCrew] = [
+        _OldCrew(m.get("name", ""), m.get("job", ""), m.get("department", ""))
+        for m in credits.get("crew") or []
+        if isinstance(m, dict) and "name" in m
+    ]
+    directors = [
+        m
+        for m in clean_crew
+        if "directing" in m.department.lower() and "director" in m.job.lower()
+    ]
+    writers = [m for m in clean_crew if "writing" in m.department.lower()]
+    actors = sorted(clean_cast, key=lambda x: x.order)[:top_n]
+    return directors, writers, actors
+
+
+def peak_bytes(fn, credits) -> int:
+    tracemalloc.start()
+    fn(credits)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(cast: int, crew: int, runs: int) -> Dict[str, Any]:
+    credits = make_credits(cast, crew)
+    api = TMDbBase()
+
+    new = api.parse_movie_credits(credits)
+    directors, writers, actors = old_parse(credits)
+    assert [a.name for a in new.actors] == [a.name for a in actors]
+    assert [d.name for d in new.directors] == [d.name for d in directors]
+    assert [w.name for w in new.writers] == [w.name for w in writers]
+
+    results = {}
+    for name, fn in (("old", old_parse), ("new", api.parse_movie_credits)):
+        seconds = min(timeit.repeat(lambda: fn(credits), number=runs, repeat=3))
+        results[name] = {
+            "us_per_call": seconds / runs * 1e6,
+            "peak_bytes": peak_bytes(fn, credits),
+        }
+    return {"cast": cast, "crew": crew, "runs": runs, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cast", type=int, default=300)
+    parser.add_argument("--crew", type=int, default=600)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.cast, args.crew, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Local stand-in for the TMDB API, for benchmarks that must not hit the network.
+
+Serves /search/movie, /movie/{id} (with `append_to_response=credits`) and
+/movie/{id}/credits with a configurable response latency and error rate.
+Runs its own event loop in a background thread, so both the blocking and the
+aiohttp client can talk to it.
+
+    python -m benchmarks.fake_tmdb [--port 8765] [--latency-ms 50] [--error-rate 0.05]
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from benchmarks.credits_parse import make_credits
+
+
+class FakeTMDb:
+    """
+    Parameters:
+        latency (float, default=0.05): Mean seconds before each response.
+        jitter (float, default=0.5): Latency varies by up to this fraction.
+        error_rate (float, default=0.0): Share of requests answered with `error_status`.
+        error_status (int, default=503): Status used for injected errors.
+        cast (int, default=60): Cast entries in every credits response.
+        crew (int, default=120): Crew entries in every credits response.
+        port (int, default=0): Port to listen on, 0 picks a free one.
+        seed (int, default=0): Seed for latency and error injection.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        cast: int = 60,
+        crew: int = 120,
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.port = port
+        self.credits = make_credits(cast, crew, seed)
+        self.requests = 0
+        self.errors = 0
+
+        self._rng = random.Random(seed)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/3"
+
+    # ---- Responses ---- #
+    async def _respond(self, body: Dict[str, Any]) -> web.Response:
+        self.requests += 1
+        delay = self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(max(delay, 0.0))
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"status_message": "Injected error"},
+                status=self.error_status,
+                headers={"Retry-After": "0"} if self.error_status == 429 else None,
+            )
+        return web.json_response(body)
+
+    @staticmethod
+    def _movie(movie_id: int, title: str = "") -> Dict[str, Any]:
+        return {
+            "id": movie_id,
+            "title": title or f"Godzilla Film {movie_id}",
+            "overview": "A giant monster attacks.",
+            "release_date": "1954-11-03",
+            "runtime": 96,
+            "budget": 0,
+            "revenue": 0,
+            "vote_average": 7.5,
+            "genres": [{"id": 27, "name": "Horror"}, {"id": 878, "name": "Sci-Fi"}],
+            "poster_path": f"/poster{movie_id}.jpg",
+            "production_companies": [{"name": "Toho", "logo_path": "/toho.png"}],
+            "original_language": "ja",
+            "origin_country": ["JP"],
+        }
+
+    async def search(self, request: web.Request) -> web.Response:
+        query = request.query.get("query", "")
+        results = [
+            {"id": 1000 + i, "title": title, "release_date": "1954-11-03"}
+            for i, title in enumerate(
+                [query, f"{query} Returns", f"Son of {query}", "Godzilla"]
+            )
+        ]
+        return await self._respond({"page": 1, "results": results})
+
+    async def movie(self, request: web.Request) -> web.Response:
+        movie_id = int(request.match_info["id"])
+        body = self._movie(movie_id)
+        if "credits" in request.query.get("append_to_response", ""):
+            body["credits"] = self.credits
+        return await self._respond(body)
+
+    async def movie_credits(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            {"id": int(request.match_info["id"]), **self.credits}
+        )
+
+    # ---- Lifecycle ---- #
+    def _serve(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        app = web.Application()
+        app.router.add_get("/3/search/movie", self.search)
+        app.router.add_get("/3/movie/{id}", self.movie)
+        app.router.add_get("/3/movie/{id}/credits", self.movie_credits)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port)
+        loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]  # type: ignore
+        self._ready.set()
+        loop.run_forever()
+
+        loop.run_until_complete(self._runner.cleanup())
+        loop.close()
+
+    def start(self) -> "FakeTMDb":
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop = self._thread = None
+
+    def __enter__(self) -> "FakeTMDb":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with FakeTMDb(
+        latency=args.latency_ms / 1000, error_rate=args.error_rate, port=args.port
+    ) as server:
+        print(f"Fake TMDB listening on {server.base_url}, Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
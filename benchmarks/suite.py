@@ -0,0 +1,324 @@
+"""
+Offline benchmark suite for the catalog, the /movie list pages and TMDB lookups.
+
+Builds synthetic ODS and SQLite catalogs (see `benchmarks.catalogs`), times
+the operations behind the slash commands, and runs TMDB lookups against a
+local fake server (`benchmarks.fake_tmdb`) with configurable latency and
+error rate. Results are written as JSON; pass an earlier results file to
+`--compare` to see what got slower.
+
+    python -m benchmarks.suite [--sizes 100 1000 10000 50000] [--backends ods sqlite]
+        [--latency-ms 50] [--error-rate 0.0] [--out results.json]
+        [--compare baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("TMDB_ACCESS", "benchmark")
+
+from benchmarks.catalogs import build_storage  # noqa: E402
+from benchmarks.fake_tmdb import FakeTMDb  # noqa: E402
+from movie_manager.catalog import MovieCatalog  # noqa: E402
+from movie_manager.storage import open_storage  # noqa: E402
+from utils.tmdb.async_tmdb_api import AsyncTMDbAPI  # noqa: E402
+from utils.tmdb.scheduler import RequestScheduler  # noqa: E402
+from utils.tmdb.tmdb_api import TMDbAPI  # noqa: E402
+
+DEFAULT_WORKDIR = os.path.join(os.path.dirname(__file__), ".data")
+
+# Keywords for the three search paths: everything, substring hits, fuzzy fallback
+KEYWORDS = {"all": "", "substring": "ghidorah", "fuzzy": "godzila raids agian"}
+
+
+def summarize(
+    name: str, samples: List[float], errors: int = 0, **labels: Any
+) -> Dict[str, Any]:
+    """
+    One result row: per-call latencies in milliseconds plus the error count.
+    `samples` only holds successful calls, `runs` counts those.
+    """
+    ordered = sorted(samples)
+    return {
+        "op": name,
+        **labels,
+        "runs": len(ordered),
+        "errors": errors,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": ordered[len(ordered) // 2] * 1000 if ordered else 0.0,
+        "p95_ms": (
+            ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+            if ordered
+            else 0.0
+        ),
+        "min_ms": ordered[0] * 1000 if ordered else 0.0,
+    }
+
+
+def timed(fn: Callable[[], Any], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+# ---- Catalog ---- #
+def bench_catalog(
+    workdir: str, backend: str, rows: int, repeat: int
+) -> List[Dict[str, Any]]:
+    labels = {"backend": backend, "rows": rows}
+    # Loading a large sheet takes seconds, time it less often
+    slow_runs = 1 if rows >= 10_000 else 3
+    results = []
+
+    source = build_storage(workdir, backend, rows)
+    source.close()
+
+    # Writes go to a scratch copy so the generated catalog stays as built
+    scratch = os.path.join(workdir, f"scratch-{rows}{os.path.splitext(source.path)[1]}")
+    journal = os.path.join(workdir, f"scratch-{rows}.journal.jsonl")
+    for path in (scratch, journal, f"{scratch}-wal", f"{scratch}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.copy(source.path, scratch)
+
+    storage = open_storage(backend, scratch, "Movie List")
+    catalog = MovieCatalog(storage, journal_path=journal)
+
+    def cold_load() -> None:
+        MovieCatalog(storage, journal_path=journal).load()
+
+    results.append(summarize("load", timed(cold_load, slow_runs), **labels))
+    catalog.load()
+
+    for kind, keyword in KEYWORDS.items():
+        samples = timed(lambda: catalog.list_movies(keyword), repeat)
+        results.append(summarize(f"list_movies[{kind}]", samples, **labels))
+
+    rng = random.Random(0)
+    movies = catalog.movies()
+    picks = [rng.choice(movies) for _ in range(repeat * 5)]
+    samples = []
+    for movie in picks:
+        status = "No" if movie.own == "Yes" else "Yes"
+        started = time.perf_counter()
+        catalog.set_ownership(movie.title, movie.year, status)
+        samples.append(time.perf_counter() - started)
+    results.append(summarize("set_ownership", samples, **labels))
+
+    if catalog.journal is not None:
+        results.append(summarize("compact", timed(catalog.compact, 1), **labels))
+
+    results.extend(asyncio.run(bench_views(catalog, repeat, labels)))
+    storage.close()
+    return results
+
+
+async def bench_views(
+    catalog: MovieCatalog, repeat: int, labels: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    # Views need a running event loop, so the embeds are rendered inside one
+    from views.movie_views import MoviePages, MovieView
+
+    def cold() -> None:
+        MovieView("", MoviePages(catalog)).make_embed()
+
+    pages = MoviePages(catalog)
+    view = MovieView("", pages)
+
+    def warm() -> None:
+        view.make_embed()
+
+    return [
+        summarize("make_embed[cold]", timed(cold, repeat), **labels),
+        summarize("make_embed[warm]", timed(warm, repeat), **labels),
+    ]
+
+
+# ---- TMDB ---- #
+def bench_tmdb_sync(server: FakeTMDb, repeat: int) -> Dict[str, Any]:
+    api = TMDbAPI()
+    api.base_url = server.base_url
+    samples, errors = [], 0
+    for i in range(repeat):
+        started = time.perf_counter()
+        try:
+            ok = api.get_movie_embed_data(f"Godzilla {i}").success
+        except Exception:
+            ok = False
+        # Failed lookups (raised or success=False) aren't latency samples
+        if ok:
+            samples.append(time.perf_counter() - started)
+        else:
+            errors += 1
+    return summarize("tmdb_embed[sync]", samples, errors, backend="fake-tmdb")
+
+
+async def bench_tmdb_async(
+    server: FakeTMDb, repeat: int, concurrency: int
+) -> Dict[str, Any]:
+    # Fast retries: the suite measures the client, not TMDB's real backoff
+    scheduler = RequestScheduler(base_delay=0.01, max_delay=0.1)
+    samples: List[float] = []
+    errors = 0
+
+    async with AsyncTMDbAPI(scheduler=scheduler) as api:
+        api.base_url = server.base_url
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await api.get_movie_embed_data(f"Godzilla {i}")
+                    ok = result.success
+                except Exception:
+                    ok = False
+                if ok:
+                    samples.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(repeat)))
+        wall = time.perf_counter() - started
+
+    result = summarize("tmdb_embed[async]", samples, errors, backend="fake-tmdb")
+    result["concurrency"] = concurrency
+    result["wall_ms"] = wall * 1000
+    return result
+
+
+# ---- Reporting ---- #
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(row: Dict[str, Any]) -> str:
+    return f"{row['op']}|{row.get('backend', '')}|{row.get('rows', '')}"
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Print p50 changes against `baseline` to stderr and return the keys that
+    regressed by more than `threshold` (0.25 = 25% slower).
+    """
+    before = {result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    print(
+        f"{'op':<24} {'backend':<10} {'rows':>6} "
+        f"{'p50 before':>11} {'after':>9} {'change':>8}",
+        file=sys.stderr,
+    )
+    for row in current["results"]:
+        key = result_key(row)
+        old = before.get(key)
+        if old is None or not old["p50_ms"]:
+            continue
+        change = row["p50_ms"] / old["p50_ms"] - 1
+        flag = " !" if change > threshold else ""
+        print(
+            f"{row['op']:<24} {row.get('backend', ''):<10} {row.get('rows', ''):>6} "
+            f"{old['p50_ms']:>11.3f} {row['p50_ms']:>9.3f} {change:>+8.1%}{flag}",
+            file=sys.stderr,
+        )
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 50_000]
+    )
+    parser.add_argument(
+        "--backends", nargs="+", choices=["ods", "sqlite"], default=["ods", "sqlite"]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tmdb-requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-tmdb", action="store_true")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR)
+    parser.add_argument("--out", help="Write results here instead of stdout")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for backend in args.backends:
+        for rows in args.sizes:
+            print(f"[bench] {backend} {rows} rows", file=sys.stderr)
+            results.extend(bench_catalog(args.workdir, backend, rows, args.repeat))
+
+    if not args.skip_tmdb:
+        print("[bench] TMDB against the fake server", file=sys.stderr)
+        with FakeTMDb(
+            latency=args.latency_ms / 1000, error_rate=args.error_rate
+        ) as server:
+            results.append(bench_tmdb_sync(server, args.tmdb_requests))
+            results.append(
+                asyncio.run(
+                    bench_tmdb_async(server, args.tmdb_requests, args.concurrency)
+                )
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {
+                k: v for k, v in vars(args).items() if k not in ("out", "compare")
+            },
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(
+                f"{len(regressions)} regressions over {args.threshold:.0%}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
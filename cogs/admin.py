@@ -1,15 +1,75 @@
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
+from movie_manager.enrichment import enrich_catalog
+from movie_manager.movie_manager import (
+    async_catalog,
+    catalog,
+    guild_catalogs,
+    make_storage,
+)
+from utils.command_sync import CommandSyncer
+from utils.guilds import add_command, command_scopes, home_guild
+from utils.interactions import Reply, run_deferred
+from utils.logs import get_logger
+from utils.memory import (
+    discord_cache_sizes,
+    live_objects,
+    megabytes,
+    peak_rss_bytes,
+    rss_bytes,
+    start_tracing,
+    stop_tracing,
+    top_allocations,
+)
+from utils.metrics import metrics
+from views.movie_views import page_cache_sizes
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-GUILD_ID = os.getenv("GUILD_ID")
+log = get_logger(__name__)
+
+
+def counted(counters: Dict[str, Dict[str, int]], kind: str) -> Dict[str, int]:
+    """Counter values of one kind from `metrics.snapshot()`, by name."""
+    return {
+        name.split(":", 1)[1]: counter["value"]
+        for name, counter in sorted(counters.items())
+        if name.startswith(f"{kind}:")
+    }
+
+
+def format_counts(counts: Dict[str, Any]) -> str:
+    return ", ".join(f"{name} {value}" for name, value in counts.items()) or "none"
+
+
+def format_allocations(rows: List[Tuple[str, int, int]]) -> str:
+    """Code block table of tracemalloc's largest allocations, in KB."""
+    lines = [f"{'location':<36} {'KB':>8} {'blocks':>7}"]
+    for location, size, count in rows:
+        lines.append(f"{location[-36:]:<36} {size / 1024:>8.1f} {count:>7}")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+
+def format_latency_table(rows: Dict[str, Dict[str, Any]], limit: int = 12) -> str:
+    """
+    Code block table of p50/p95/p99 latencies (ms) and error rates for the
+    `limit` busiest names, short enough for one embed field.
+    """
+    busiest = sorted(rows.items(), key=lambda item: -item[1]["count"])[:limit]
+    lines = [f"{'name':<22} {'n':>6} {'err%':>5} {'p50':>7} {'p95':>7} {'p99':>7}"]
+    for name, s in busiest:
+        lines.append(
+            f"{name[:22]:<22} {s['count']:>6} {s['error_rate'] * 100:>5.1f} "
+            f"{s['p50'] * 1000:>7.1f} {s['p95'] * 1000:>7.1f} {s['p99'] * 1000:>7.1f}"
+        )
+    return "```\n" + "\n".join(lines) + "\n```"
 
 
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.GUILD_ID = GUILD_ID
+        self.enriching = False
 
     admin_group = app_commands.Group(name="admin", description="Admin only commands")
 
@@ -23,72 +83,326 @@ class Admin(commands.Cog):
         return app_commands.check(predicate)
 
     @admin_group.command(
-        name="sync", description="Sync slash commands(owner only, don't use)"
+        name="sync", description="Sync changed slash commands (owner only)"
+    )
+    @app_commands.describe(
+        dry_run="Only show what would be synced",
+        force="Sync even if nothing changed",
+    )
+    @is_owner.__get__(object)()
+    async def sync_commands(
+        self,
+        interaction: discord.Interaction,
+        dry_run: bool = False,
+        force: bool = False,
+    ):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        syncer = CommandSyncer(self.bot.tree)
+        if dry_run:
+            diffs = syncer.plan(command_scopes())
+            lines = [diff.describe() for diff in diffs]
+        else:
+            synced = await syncer.sync(command_scopes(), force=force)
+            lines = [f"Synced {diff.describe()}" for diff in synced] or [
+                "Nothing changed, no sync needed."
+            ]
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+    # ---- Movie storage import / export ---- #
+    @admin_group.command(
+        name="export", description="Copy the movie catalog into another storage format"
     )
     @is_owner.__get__(object)()
-    async def sync_commands(self, interaction: discord.Interaction):
-        guild = discord.Object(id=int(self.GUILD_ID))  # type: ignore
-        self.bot.tree.copy_global_to(guild=guild)
-        synced = await self.bot.tree.sync(guild=guild)
-        await interaction.response.send_message(
-            f"Synced {len(synced)} commands.", ephemeral=True
+    async def export_movies(
+        self, interaction: discord.Interaction, target: Literal["ods", "sqlite"]
+    ):
+        if target == catalog.storage.name:
+            await interaction.response.send_message(
+                f"ℹ️ The catalog is already stored as {target}.", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        storage = make_storage(target)
+        try:
+            count = await async_catalog.export_to(storage)
+        finally:
+            storage.close()
+        await interaction.followup.send(
+            f"✅ Exported {count} movies to {target}.", ephemeral=True
         )
-        guild_cmds = await self.bot.tree.fetch_commands(guild=guild)
-        global_cmds = await self.bot.tree.fetch_commands()
 
-        print(f"Guild Commands: {guild_cmds}\nGlobal commands: {global_cmds}")
+    @admin_group.command(
+        name="import", description="Load movies from another storage format"
+    )
+    @is_owner.__get__(object)()
+    async def import_movies(
+        self, interaction: discord.Interaction, source: Literal["ods", "sqlite"]
+    ):
+        if source == catalog.storage.name:
+            await interaction.response.send_message(
+                f"ℹ️ The catalog is already stored as {source}.", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        storage = make_storage(source)
+        try:
+            count = await async_catalog.import_from(storage)
+        finally:
+            storage.close()
+        await interaction.followup.send(
+            f"✅ Imported {count} movies from {source}.", ephemeral=True
+        )
+
+    # ---- Metrics ---- #
+    @admin_group.command(
+        name="stats", description="Latency percentiles and error rates (owner only)"
+    )
+    @is_owner.__get__(object)()
+    async def show_stats(self, interaction: discord.Interaction):
+        snapshot = metrics.snapshot()
+        embed = discord.Embed(title="Bot stats", color=discord.Color.blurple())
+        titles = {
+            "command": "Slash commands",
+            "deferred": "Deferred work",
+            "autocomplete": "Autocomplete",
+            "tmdb": "TMDB endpoints",
+            "storage": "Storage operations",
+        }
+        for kind, title in titles.items():
+            if kind in snapshot:
+                embed.add_field(
+                    name=title,
+                    value=format_latency_table(snapshot[kind]),
+                    inline=False,
+                )
+
+        tmdb = getattr(self.bot, "tmdb", None)
+        if tmdb is not None:
+            queue = tmdb.scheduler.stats()
+            embed.add_field(
+                name="TMDB queue",
+                value=(
+                    f"depth {queue['queue_depth']}, retries {queue['retries']}, "
+                    f"rate limited {queue['rate_limited']}"
+                ),
+                inline=False,
+            )
+        counters = snapshot.get("counters", {})
+        resolved = counted(counters, "resolve")
+        if resolved:
+            embed.add_field(
+                name="Title resolution",
+                value=", ".join(f"{k} {v}" for k, v in sorted(resolved.items())),
+                inline=False,
+            )
+        deferred = [
+            f"{label} {sum(found.values())} ({format_counts(found)})"
+            for kind, label in (
+                ("deadline_miss", "deadline misses"),
+                ("deferred_timeout", "timeouts"),
+                ("deferred_cancelled", "cancelled"),
+            )
+            if (found := counted(counters, kind))
+        ]
+        if deferred:
+            embed.add_field(
+                name="Deferred replies", value="\n".join(deferred), inline=False
+            )
+        posters = getattr(self.bot, "posters", None)
+        if posters is not None:
+            cache = posters.stats()
+            embed.add_field(
+                name="Poster cache",
+                value=(
+                    f"{cache['files']} files, {cache['bytes'] / 1e6:.1f} MB; "
+                    f"hits {cache['hits']}, downloads {cache['downloads']}, "
+                    f"CDN reuse {cache['reused']}, failed {cache['failed']}"
+                ),
+                inline=False,
+            )
+        report = getattr(self.bot, "startup_report", None)
+        if report is not None:
+            embed.add_field(
+                name="Startup",
+                value=", ".join(
+                    f"{name} {seconds:.2f}s"
+                    for name, seconds in report.milestones.items()
+                ),
+                inline=False,
+            )
+        if not embed.fields:
+            embed.description = "No requests recorded yet."
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ---- Memory ---- #
+    @admin_group.command(
+        name="memory", description="Memory use, caches and allocations (owner only)"
+    )
+    @app_commands.describe(
+        trace="Start or stop tracemalloc (it slows the bot down while on)",
+        limit="How many of the largest allocations to list",
+    )
+    @is_owner.__get__(object)()
+    async def show_memory(
+        self,
+        interaction: discord.Interaction,
+        trace: Optional[Literal["start", "stop"]] = None,
+        limit: app_commands.Range[int, 1, 15] = 10,
+    ):
+        if trace == "start":
+            start_tracing(frames=1)
+        elif trace == "stop":
+            stop_tracing()
+
+        async def work() -> Reply:
+            # Walking the heap and snapshotting traces take a while on a big bot
+            views = await asyncio.to_thread(live_objects, discord.ui.View)
+            allocations = await asyncio.to_thread(top_allocations, limit)
+            profile = getattr(self.bot, "memory_profile", None)
+
+            embed = discord.Embed(title="Memory", color=discord.Color.blurple())
+            embed.add_field(
+                name="Process",
+                value=(
+                    f"RSS {megabytes(rss_bytes())} MB, "
+                    f"peak {megabytes(peak_rss_bytes())} MB, "
+                    f"profile {profile.name if profile else 'default'}"
+                ),
+                inline=False,
+            )
+            embed.add_field(
+                name="discord.py caches",
+                value=format_counts(discord_cache_sizes(self.bot)),
+                inline=False,
+            )
+            store = self.bot._connection._view_store
+            embed.add_field(
+                name="Views",
+                value=(
+                    f"message views {len(store._synced_message_views)}, "
+                    f"listening items {sum(map(len, store._views.values()))}, "
+                    f"dynamic item types {len(store._dynamic_items)}; "
+                    f"live {format_counts(views)}"
+                ),
+                inline=False,
+            )
+
+            caches: Dict[str, Any] = {}
+            tmdb_cache = getattr(self.bot, "tmdb_cache", None)
+            if tmdb_cache is not None:
+                tmdb = await asyncio.to_thread(tmdb_cache.stats)
+                caches["tmdb memory"] = tmdb["memory_entries"]
+                caches["tmdb disk"] = tmdb["disk_entries"]
+            posters = getattr(self.bot, "posters", None)
+            if posters is not None:
+                poster_stats = posters.stats()
+                caches["poster files"] = poster_stats["files"]
+                caches["poster uploads"] = poster_stats["uploads"]
+            pages = page_cache_sizes()
+            caches["list results"] = pages["results"]
+            caches["list pages"] = pages["pages"]
+            opened = guild_catalogs.opened()
+            caches["catalogs"] = len(opened)
+            caches["catalog movies"] = sum(
+                len(c.catalog.cached_index().movies) for c in opened
+            )
+            caches["metrics"] = len(metrics.histograms)
+            embed.add_field(
+                name="Bot caches", value=format_counts(caches), inline=False
+            )
+
+            if allocations:
+                embed.add_field(
+                    name="Largest allocations since tracing started",
+                    value=format_allocations(allocations),
+                    inline=False,
+                )
+            else:
+                embed.add_field(
+                    name="Allocations",
+                    value=(
+                        "tracemalloc is off; use `trace:start` or set TRACEMALLOC "
+                        "to trace from startup."
+                    ),
+                    inline=False,
+                )
+            return {"embed": embed}
+
+        await run_deferred(
+            interaction, work, name="admin memory", timeout=60.0, ephemeral=True
+        )
+
+    # ---- TMDb enrichment ---- #
+    @admin_group.command(
+        name="enrich", description="Look up and store the TMDB id of every movie"
+    )
+    @app_commands.describe(force="Also re-resolve movies that already have an id")
+    @is_owner.__get__(object)()
+    async def enrich_movies(
+        self, interaction: discord.Interaction, force: bool = False
+    ):
+        if self.enriching:
+            await interaction.response.send_message(
+                "ℹ️ Enrichment is already running.", ephemeral=True
+            )
+            return
+
+        async def work() -> Reply:
+            self.enriching = True
+            try:
+                report = await enrich_catalog(
+                    async_catalog, self.bot.tmdb, force=force  # type: ignore
+                )
+            finally:
+                self.enriching = False
+            return {"content": report.summary()}
+
+        # Large catalogs take a while at background priority
+        await run_deferred(
+            interaction, work, name="admin enrich", timeout=900.0, ephemeral=True
+        )
 
     # For non slash commands
     @staticmethod
     def isowner_ctx():
         async def predicate(ctx: commands.Context):
-            print("Author:", ctx.author)
+            log.debug("admin.check", author=str(ctx.author))
             return await ctx.bot.is_owner(ctx.author)
 
         return commands.check(predicate)
 
     @commands.command()
     @isowner_ctx()
-    async def sinkit(self, ctx):
-        guild = discord.Object(id=int(self.GUILD_ID))  # type: ignore
-
-        print("DEBUG: Commands in bot.tree before sync ===")
-        for cmd in self.bot.tree.walk_commands():
-            print(f"{cmd.name} {type(cmd)}")
-
-        self.bot.tree.copy_global_to(guild=guild)
-        synced = await self.bot.tree.sync(guild=guild)
-        print(f"Synced {len(synced)} commands.")
-        for cmd in synced:
-            print(f"- {cmd.name}")
-
-        global_synced = await self.bot.tree.sync()
-        print(f"Global synced: {len(global_synced)}")
-
-        await ctx.send(f"Synced {len(synced)} commands.")
+    async def sinkit(self, ctx, mode: str = ""):
+        """Sync changed commands; "dry" shows the diff, "force" syncs everything."""
+        syncer = CommandSyncer(self.bot.tree)
+        if mode == "dry":
+            lines = [diff.describe() for diff in syncer.plan(command_scopes())]
+        else:
+            synced = await syncer.sync(command_scopes(), force=mode == "force")
+            lines = [f"Synced {diff.describe()}" for diff in synced] or [
+                "Nothing changed, no sync needed."
+            ]
+        await ctx.send("\n".join(lines))
 
     @commands.command()
     @isowner_ctx()
     async def clearc(self, ctx):
-        guild = discord.Object(id=int(GUILD_ID))  # type: ignore
-        self.bot.tree.clear_commands(guild=guild)
-        self.bot.tree.clear_commands(guild=None)
-
-        await self.bot.tree.sync(guild=guild)
-        await self.bot.tree.sync(guild=None)
-
-        guild_cmds = await self.bot.tree.fetch_commands(guild=guild)
-        global_cmds = await self.bot.tree.fetch_commands()
+        scopes = command_scopes()
+        for guild in scopes:
+            self.bot.tree.clear_commands(guild=guild)
 
-        print(f"Guild Commands: {guild_cmds}\nGlobal commands: {global_cmds}")
+        # Only scopes that had commands need the (now empty) upload
+        synced = await CommandSyncer(self.bot.tree).sync(scopes)
+        log.info("commands.cleared", scopes=[diff.scope for diff in synced])
         await ctx.send("Cleared commands")
 
     async def cog_load(self) -> None:
-        guild = discord.Object(id=int(GUILD_ID))  # type: ignore
-        if not self.bot.tree.get_command("admin", guild=guild):
-            self.bot.tree.add_command(self.admin_group, guild=guild)
-        # if not self.bot.tree.get_command("admin"):
-        #     self.bot.tree.add_command(self.admin_group)
+        add_command(self.bot.tree, self.admin_group, [home_guild()])
 
 
 async def setup(bot: commands.Bot):
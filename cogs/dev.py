@@ -1,8 +1,7 @@
 import discord
 from discord.ext import commands
-import os
-
-GUILD_ID = os.getenv("GUILD_ID")
+from utils.command_sync import CommandSyncer
+from utils.guilds import command_scopes
 
 
 class Dev(commands.Cog):
@@ -23,12 +22,10 @@ class Dev(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def clear_commands(self, ctx):
-        self.bot.tree.clear_commands(guild=None)
-        await self.bot.tree.sync()
-
-        guild_obj = discord.Object(id=int(GUILD_ID))  # type: ignore
-        self.bot.tree.clear_commands(guild=guild_obj)
-        await self.bot.tree.sync(guild=guild_obj)
+        scopes = command_scopes()
+        for guild in scopes:
+            self.bot.tree.clear_commands(guild=guild)
+        await CommandSyncer(self.bot.tree).sync(scopes)
 
         await ctx.send("All commands cleared from Discord")
 
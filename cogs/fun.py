@@ -1,10 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import os
-
-
-GUILD_ID = os.getenv("GUILD_ID")
+from utils.guilds import add_command, public_scopes
 
 
 class Fun(commands.Cog):
@@ -31,11 +28,7 @@ class Fun(commands.Cog):
         await interaction.response.send_message(embed=e_message)
 
     async def cog_load(self) -> None:
-        guild = discord.Object(id=int(GUILD_ID))  # type: ignore
-        if not self.bot.tree.get_command("godzilla", guild=guild):
-            self.bot.tree.add_command(self.godzilla_group, guild=guild)
-        # if not self.bot.tree.get_command("godzilla"):
-        #     self.bot.tree.add_command(self.godzilla_group)
+        add_command(self.bot.tree, self.godzilla_group, public_scopes())
 
 
 async def setup(bot: commands.Bot):
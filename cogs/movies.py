@@ -1,14 +1,66 @@
+import asyncio
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from movie_manager.movie_manager import list_movies
-from utils.tmdb.tmdb_api import TMDbAPI
-from views.movie_views import MovieUpdater, MovieView
-import os
-from typing import Optional
+from movie_manager.bulk import (
+    MAX_CSV_BYTES,
+    BulkOwnershipReport,
+    OwnershipResult,
+    parse_csv,
+    parse_titles,
+)
+from movie_manager.async_catalog import AsyncMovieCatalog
+from movie_manager.movie_manager import async_catalog, catalog, guild_catalogs
+from movie_manager.resolver import resolve_movie
+from movie_manager.stats import DIMENSIONS, format_stats
+from utils.guilds import add_command, public_scopes
+from utils.sharding import runs_guild
+from utils.logs import get_logger
+from utils.interactions import Reply, cancel_background, run_deferred
+from utils.tmdb.posters import PosterCache
+from views.movie_views import MovieUpdater, MovieView, OwnershipButton, pages_for
+from typing import List, Literal, Optional
 
-GUILD_ID = os.getenv("GUILD_ID")
-api = TMDbAPI()
+log = get_logger(__name__)
+
+# Discord allows at most 25 choices and 100 characters per choice name
+MAX_CHOICES = 25
+
+
+# ---- Autocomplete ---- #
+# Served from the in-memory search index only, never from disk or TMDB.
+async def title_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[str]]:
+    index = catalog.cached_index()
+    movies = index.suggest(current, limit=MAX_CHOICES)
+
+    year = getattr(interaction.namespace, "year", None)
+    if isinstance(year, int):
+        movies = [m for m in movies if m.year == year] or movies
+
+    return [
+        app_commands.Choice(name=f"{m.title} ({m.year})"[:100], value=m.title[:100])
+        for m in movies
+    ]
+
+
+async def year_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[int]]:
+    index = catalog.cached_index()
+    title = getattr(interaction.namespace, "title", None) or ""
+
+    years = index.years_for(title)
+    if not years:
+        years = sorted({m.year for m in index.suggest(title, limit=MAX_CHOICES)})
+
+    current = str(current).strip()
+    return [
+        app_commands.Choice(name=str(year), value=year)
+        for year in years
+        if str(year).startswith(current)
+    ][:MAX_CHOICES]
 
 
 class Movies(commands.Cog):
@@ -21,6 +73,7 @@ class Movies(commands.Cog):
     @app_commands.describe(
         year="The year the movie was released", title="The title of the movie"
     )
+    @app_commands.autocomplete(title=title_autocomplete, year=year_autocomplete)
     async def own_movie(self, interaction: discord.Interaction, year: int, title: str):
         embed = discord.Embed(
             title=f"{title} ({year})",
@@ -28,37 +81,169 @@ class Movies(commands.Cog):
             color=discord.Color.green(),
         )
 
+        # Thumbnail only if it is already cached, the reply can't wait for TMDB
+        posters: PosterCache = self.bot.posters  # type: ignore
+        files = []
+        movie = catalog.cached_movie(title, year)
+        if movie is not None and movie.poster_path:
+            image = await posters.image(movie.poster_path, "thumb", download=False)
+            if image is not None:
+                embed.set_thumbnail(url=image.url)
+                if image.file is not None:
+                    files.append(image.file)
+            else:
+                # Next time it will be there
+                posters.prefetch(movie.poster_path, "thumb")
+
         await interaction.response.send_message(
-            embed=embed, view=MovieUpdater(title, year)
+            embed=embed, view=MovieUpdater(title, year), files=files
         )
+        if files:
+            posters.remember_upload(await interaction.original_response())
 
     @movie_group.command(
         name="list", description="List Godzilla Films, can search by keyword"
     )
     async def return_movies(self, interaction: discord.Interaction, keyword: str = ""):
         # keyword = " ".join(keyword)
-        movies = list_movies(keyword=keyword)
-        if not movies:
-            await interaction.response.send_message("ℹ️ No movies found.")
+        # Opening a guild's catalog for the first time reads (or creates) its
+        # file, so acknowledge the interaction before doing that
+        view: Optional[MovieView] = None
+
+        async def work() -> Reply:
+            nonlocal view
+            # Pick up outside edits off the event loop, pages are then rendered
+            # from the in-memory catalog
+            collection = await guild_catalogs.get(interaction.guild_id)
+            await collection.refresh()
+            view = MovieView(keyword, pages_for(collection.catalog), collection)
+            if not view.pages.page_count(keyword):
+                return {"content": "ℹ️ No movies found."}
+            return {"embed": view.make_embed(), "view": view}
+
+        def sent(message: discord.Message) -> None:
+            if view is not None:
+                view.message = message
+
+        await run_deferred(interaction, work, name="movie list", on_sent=sent)
+
+    @movie_group.command(
+        name="bulk", description="Change ownership of many movies at once"
+    )
+    @app_commands.describe(
+        titles='Titles separated by ";" or new lines, e.g. "Godzilla (1954); Mothra"',
+        status="What to mark them as (CSV rows can override it)",
+        csv_file="CSV with title, year and optionally own columns",
+    )
+    async def bulk_own(
+        self,
+        interaction: discord.Interaction,
+        titles: str = "",
+        status: Literal["owned", "not owned"] = "owned",
+        csv_file: Optional[discord.Attachment] = None,
+    ):
+        if not titles and csv_file is None:
+            await interaction.response.send_message(
+                "ℹ️ Give some titles or attach a CSV file.", ephemeral=True
+            )
             return
-        view = MovieView(movies)
-        await interaction.response.send_message(embed=view.make_embed(), view=view)
+        await run_deferred(
+            interaction,
+            lambda: self.bulk_reply(interaction.guild_id, titles, status, csv_file),
+            name="movie bulk",
+            timeout=60,
+        )
+
+    async def bulk_reply(
+        self,
+        guild_id: Optional[int],
+        titles: str,
+        status: str,
+        csv_file: Optional[discord.Attachment],
+    ) -> Reply:
+        own = "Yes" if status == "owned" else "No"
+        changes = parse_titles(titles, own)
+        invalid: List[OwnershipResult] = []
+        if csv_file is not None:
+            if csv_file.size > MAX_CSV_BYTES:
+                return {"content": f"⚠️ {csv_file.filename} is too large."}
+            try:
+                rows, invalid = parse_csv(await csv_file.read(), own)
+            except ValueError as e:
+                return {"content": f"⚠️ {csv_file.filename}: {e}"}
+            changes.extend(rows)
+
+        # Validated against the catalog and written together, one write in all
+        collection = await guild_catalogs.get(guild_id)
+        results = await collection.set_ownership_many(changes)
+        return {"content": BulkOwnershipReport(results + invalid).summary()}
+
+    @movie_group.command(
+        name="stats", description="How much of each era, decade and studio we own"
+    )
+    @app_commands.describe(by="Group by era, decade or studio (default: all three)")
+    async def collection_stats(
+        self,
+        interaction: discord.Interaction,
+        by: Optional[Literal["era", "decade", "studio"]] = None,
+    ):
+        await run_deferred(
+            interaction,
+            lambda: self.stats_reply(interaction.guild_id, by),
+            name="movie stats",
+        )
+
+    async def stats_reply(self, guild_id: Optional[int], by: Optional[str]) -> Reply:
+        collection = await guild_catalogs.get(guild_id)
+        # Counters kept current by the catalog, nothing is recounted here
+        stats = await collection.stats()
+        overall = stats.overall()
+        if not overall.total:
+            return {"content": "ℹ️ No movies found."}
+
+        embed = discord.Embed(
+            title="Collection stats",
+            description=(
+                f"Own {overall.owned} of {overall.total} movies "
+                f"({overall.percent:.1f}%), {overall.unowned} missing."
+            ),
+            color=discord.Color.blurple(),
+        )
+        for dimension in [by] if by else DIMENSIONS:
+            embed.add_field(
+                name=f"By {dimension}",
+                value=format_stats(stats.by(dimension)),
+                inline=False,
+            )
+        return {"embed": embed}
 
     # ---- TMDb Movie Lookup ---- #
     @movie_group.command(name="info", description="Get movie details from TMDB")
     @app_commands.describe(
         title="Title of the movie", year="Year the movie was released"
     )
+    @app_commands.autocomplete(title=title_autocomplete, year=year_autocomplete)
     async def movie_command(self, interaction, title: str, year: Optional[int] = None):
-        lookup = api.get_movie_embed_data(title, year)
+        await run_deferred(
+            interaction,
+            lambda: self.movie_info_reply(title, year),
+            name="movie info",
+            on_sent=self.bot.posters.remember_upload,  # type: ignore
+        )
+
+    async def movie_info_reply(self, title: str, year: Optional[int]) -> Reply:
+        # Catalog titles and aliases first, TMDB search only for unknown titles
+        tmdb = self.bot.tmdb  # type: ignore
+        resolution = await resolve_movie(catalog, tmdb, title, year)
+        if resolution.tmdb_id is None:
+            return {"content": "Movie not found."}
+        lookup = await tmdb.get_movie_embed_data(movie_id=resolution.tmdb_id)
 
         if not lookup.success:
-            await interaction.response.send_message("Movie not found.")
+            return {"content": "Movie not found."}
 
         details = lookup.details
         credits = lookup.credits
-        poster = lookup.poster
-        print("Poster URL: ", poster)
 
         genres = (
             ", ".join(f"{genre}" for genre in details.genres) or "No genres available."
@@ -82,21 +267,70 @@ class Movies(commands.Cog):
         )
 
         embed = discord.Embed(title=details.title, description=details.summary)
-        embed.set_image(url=poster)
+        reply: Reply = {"embed": embed}
+        # Served from the local poster cache; TMDB's own URL only as a fallback
+        image = await self.bot.posters.image(details.poster_path)  # type: ignore
+        if image is not None:
+            embed.set_image(url=image.url)
+            if image.file is not None:
+                reply["attachments"] = [image.file]
+        else:
+            embed.set_image(url=lookup.poster)
+        log.debug("movie.poster", title=details.title, url=embed.image.url)
         embed.add_field(name="Genres:", value=genres)
         embed.add_field(name="Director(s):", value=directors)
         embed.add_field(name="Writer(s):", value=writers)
         embed.add_field(name="Main Cast:", value=main_cast, inline=False)
+        embed.set_footer(text=resolution.describe())
+
+        return reply
 
-        await interaction.response.send_message(embed=embed)
+    # ---- Ownership journal compaction ---- #
+    def compacted_here(self) -> List[AsyncMovieCatalog]:
+        """
+        The catalogs this process compacts: its guilds', and the shared one
+        only in the process serving the home guild, so with several shard
+        processes one of them rewrites the shared file and trims its journal.
+        """
+        return [
+            collection
+            for collection in guild_catalogs.opened()
+            if collection is not guild_catalogs.default
+            or runs_guild(self.bot, guild_catalogs.home_guild)  # type: ignore
+        ]
+
+    @tasks.loop(seconds=5)
+    async def compact_journal(self):
+        for collection in self.compacted_here():
+            if collection.catalog.needs_compaction():
+                await collection.compact()
+
+    async def warm_catalog(self) -> None:
+        await async_catalog.refresh()
+        report = getattr(self.bot, "startup_report", None)
+        if report is not None:
+            report.mark("catalog_loaded")
 
     # Load Commands
     async def cog_load(self) -> None:
-        guild = discord.Object(id=int(GUILD_ID))  # type: ignore
-        if not self.bot.tree.get_command("movie", guild=guild):
-            self.bot.tree.add_command(self.movie_group, guild=guild)
-        # if not self.bot.tree.get_command("movie"):
-        #     self.bot.tree.add_command(self.movie_group)
+        # Parse the movie sheet up front instead of on the first command, but
+        # in the background so it doesn't hold up connecting to Discord.
+        # Commands that need the catalog before then load it themselves.
+        self.warmup = asyncio.create_task(self.warm_catalog(), name="catalog-warmup")
+        self.compact_journal.start()
+        # Ownership cards keep no view in memory, their buttons are routed here
+        self.bot.add_dynamic_items(OwnershipButton)
+
+        add_command(self.bot.tree, self.movie_group, public_scopes())
+
+    async def cog_unload(self) -> None:
+        self.warmup.cancel()
+        self.compact_journal.cancel()
+        self.bot.remove_dynamic_items(OwnershipButton)
+        await cancel_background()
+        # Flush whatever is still only in the journals
+        for collection in self.compacted_here():
+            await collection.compact()
 
 
 async def setup(bot: commands.Bot):
@@ -1,49 +1,153 @@
+import time
+
+# Startup is reported relative to this point, before the heavy imports
+STARTED = time.perf_counter()
+
+import asyncio
 import discord
 from discord.ext import commands
+from discord import app_commands
 from dotenv import load_dotenv
-from datetime import datetime
+from movie_manager.movie_manager import async_catalog, guild_catalogs
+from utils.command_sync import CommandSyncer
+from utils.guilds import command_scopes
+from utils.interactions import MeteredCommandTree
+from utils.logs import get_logger, setup_logging, stop_logging
+from utils.memory import MemoryProfile, memory_profile, start_tracing
+from utils.sharding import runs_shard_zero, shard_options
+from utils.startup import StartupReport, discover_cogs, load_cogs
+from utils.tmdb.async_tmdb_api import AsyncTMDbAPI
+from utils.tmdb.cache import TMDbCache
+from utils.tmdb.posters import PosterCache
 import os
 
-
 load_dotenv()
+setup_logging()
+log = get_logger("bot")
 TOKEN = os.getenv("DISCORD_TOKEN")
-GUILD_ID = os.getenv("GUILD_ID")
-assert GUILD_ID is not None, "GUILD_ID not set in .env!"
 assert TOKEN is not None, "DISCORD_TOKEN not set!"
 
+# Only orders loading: cogs listed here load after the cogs they depend on, the
+# rest load together. Admin goes last so that the tree its /sync diffs against
+# (only changed scopes are uploaded) already holds every other cog's commands.
+COG_DEPENDENCIES = {
+    "cogs.admin": ["cogs.movies", "cogs.fun", "cogs.dev"],
+}
+
+
+class GojiraBot(commands.AutoShardedBot):
+    tmdb: AsyncTMDbAPI
+    tmdb_cache: TMDbCache
+    posters: PosterCache
+    startup_report: StartupReport
+    memory_profile: MemoryProfile
 
-class GojiraBot(commands.Bot):
     async def setup_hook(self) -> None:
-        for filename in os.listdir("./cogs"):
-            if filename.endswith(".py") and not filename.startswith("_"):
-                cog_path = f"cogs.{filename[:-3]}"
-                try:
-                    await self.load_extension(cog_path)
-                    print(f"Loaded cog: {cog_path}")
-                except Exception as e:
-                    print(f"Failed to load cog {cog_path}: {e}")
+        report = self.startup_report
+        report.mark("setup_hook")
+
+        # Shared TMDB client, one pooled HTTP session for the bot's lifetime
+        with report.phase("clients"):
+            self.tmdb_cache = TMDbCache(
+                max_memory_entries=self.memory_profile.tmdb_memory_entries
+            )
+            self.tmdb = AsyncTMDbAPI(cache=self.tmdb_cache)
+            await self.tmdb.start()
+            self.posters = PosterCache()
+            await self.posters.start()
+
+        with report.phase("cogs"):
+            await load_cogs(self, discover_cogs(), report, COG_DEPENDENCIES)
+
+        # Only scopes whose commands changed since the last sync are uploaded,
+        # and only by one process when the shards are split across several
+        if runs_shard_zero(self):
+            self.command_sync = asyncio.create_task(
+                self.sync_changed_commands(), name="command-sync"
+            )
+
+    async def sync_changed_commands(self) -> None:
+        try:
+            synced = await CommandSyncer(self.tree).sync(command_scopes())
+        except discord.HTTPException:
+            log.exception("command_sync.failed")
+            return
+        self.startup_report.mark("commands_synced")
+        log.info("command_sync.done", scopes=[diff.scope for diff in synced])
 
+    async def close(self) -> None:
+        if hasattr(self, "tmdb"):
+            await self.tmdb.close()
+            log.info("tmdb.cache_stats", **self.tmdb_cache.stats())
+            self.tmdb_cache.close()
+            await self.posters.close()
+            log.info("posters.stats", **self.posters.stats())
+        await super().close()
+        # Guild catalogs join metadata from the shared one, close them first
+        guild_catalogs.close()
+        async_catalog.close()
+        stop_logging()
+
+
+# Off unless TRACEMALLOC is set, started early so startup allocations show up
+start_tracing()
+profile = memory_profile()
 
 intents = discord.Intents.default()
 intents.guilds = True
 intents.message_content = True
 intents.members = True
-bot = GojiraBot(command_prefix="!", intents=intents)
+bot = GojiraBot(
+    command_prefix="!",
+    intents=intents,
+    tree_cls=MeteredCommandTree,
+    **shard_options(),
+    **profile.bot_options(),
+)
+bot.memory_profile = profile
+bot.startup_report = StartupReport(STARTED)
+bot.startup_report.mark("imports")
 
 
-# TODO: Implement logger for calls
 def log_action(action: str, user: str):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{now}] {user}: {action}")
+    log.info("user.action", action=action, user=user)
+
+
+@bot.event
+async def on_app_command_completion(
+    interaction: discord.Interaction, command: app_commands.Command
+):
+    log_action(command.qualified_name, str(interaction.user))
 
 
 # Sync API 2.0 slash commands
 @bot.event
 async def on_ready():
+    # on_ready fires again after reconnects, only the first one is startup
+    if "ready" not in bot.startup_report.milestones:
+        bot.startup_report.mark("ready")
+        log.info(
+            "startup.report",
+            memory_profile=bot.memory_profile.name,
+            **bot.startup_report.snapshot(),
+        )
+
     # Log guilds
-    print(f"Logged in as {bot.user}")
+    log.info(
+        "bot.ready",
+        user=str(bot.user),
+        shards=bot.shard_ids or list(range(bot.shard_count or 1)),
+        shard_count=bot.shard_count,
+        guilds=len(bot.guilds),
+    )
     for guild in bot.guilds:
-        print("Bot is in guild:", guild.id, guild.name)
+        log.debug("bot.guild", id=guild.id, name=guild.name, shard=guild.shard_id)
+
+
+@bot.event
+async def on_shard_ready(shard_id: int):
+    log.info("bot.shard_ready", shard=shard_id)
 
 
-bot.run(TOKEN)
+# Logging is already routed through the queue, don't let discord.py replace it
+bot.run(TOKEN, log_handler=None)
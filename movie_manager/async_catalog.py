@@ -0,0 +1,130 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from utils.metrics import metrics
+
+from .bulk import OwnershipChange, OwnershipResult
+from .catalog import CatalogSnapshot, MovieCatalog
+from .stats import CollectionStats
+from .storage import MovieStorage
+
+T = TypeVar("T")
+
+# One writer lock per storage file, shared by every catalog that points at it
+_file_locks: Dict[str, asyncio.Lock] = {}
+
+
+def file_lock(path: str) -> asyncio.Lock:
+    return _file_locks.setdefault(os.path.abspath(path), asyncio.Lock())
+
+
+class AsyncMovieCatalog:
+    """
+    Coroutine-friendly front for `MovieCatalog`.
+
+    Anything that may parse or write the spreadsheet (reloads, ownership
+    updates, import/export) runs on a small bounded thread pool so it never
+    blocks the event loop. Writers are serialized by a per-file lock; readers
+    don't wait for them and work from an immutable `CatalogSnapshot`.
+
+    Catalogs can share one `executor` (per-guild catalogs do), it is then
+    left running by `close()`.
+    """
+
+    def __init__(
+        self,
+        catalog: MovieCatalog,
+        max_workers: int = 2,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.catalog = catalog
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="catalog"
+        )
+
+    @property
+    def write_lock(self) -> asyncio.Lock:
+        return file_lock(self.catalog.storage.path)
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        # Includes time queued for a worker thread, which is what callers feel
+        with metrics.timer("storage", fn.__name__):
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ---- Reads ---- #
+    async def refresh(self) -> bool:
+        return await self._run(self.catalog.refresh)
+
+    async def snapshot(self) -> CatalogSnapshot:
+        return await self._run(self.catalog.snapshot)
+
+    async def stats(self) -> CollectionStats:
+        return await self._run(self.catalog.stats)
+
+    async def list_movies(self, keyword: str = "") -> List[dict]:
+        return await self._run(self.catalog.list_movies, keyword)
+
+    # ---- Writes ---- #
+    async def set_ownership(self, title: str, year: int, own_status: str) -> str:
+        async with self.write_lock:
+            return await self._run(self.catalog.set_ownership, title, year, own_status)
+
+    async def set_ownership_many(
+        self, changes: Sequence[OwnershipChange]
+    ) -> List[OwnershipResult]:
+        async with self.write_lock:
+            return await self._run(self.catalog.set_ownership_many, changes)
+
+    async def update_movie(self, title: str = "default", year: int = 0) -> str:
+        return await self.set_ownership(title, year, "Yes")
+
+    async def mark_not_owned(self, title: str = "default", year: int = 0) -> str:
+        return await self.set_ownership(title, year, "No")
+
+    async def set_metadata(
+        self,
+        title: str,
+        year: int,
+        tmdb_id: int,
+        poster_path: str,
+        runtime: int,
+        aliases: str = "",
+        studio: str = "",
+    ) -> bool:
+        async with self.write_lock:
+            return await self._run(
+                self.catalog.set_metadata,
+                title,
+                year,
+                tmdb_id,
+                poster_path,
+                runtime,
+                aliases,
+                studio,
+            )
+
+    async def compact(self) -> int:
+        # Compaction snapshots under the catalog lock and writes without it,
+        # so it doesn't hold up ownership updates
+        return await self._run(self.catalog.compact)
+
+    async def import_from(self, source: MovieStorage) -> int:
+        async with self.write_lock:
+            return await self._run(self.catalog.import_from, source)
+
+    async def export_to(self, target: MovieStorage) -> int:
+        async with file_lock(target.path):
+            return await self._run(self.catalog.export_to, target)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shut down the thread pool, if it is ours, and close the storage (the
+        SQLite connection). Nothing may use the catalog afterwards.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+        self.catalog.storage.close()
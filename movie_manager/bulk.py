@@ -0,0 +1,166 @@
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# Largest CSV accepted by `parse_csv`, a full catalog export is far smaller
+MAX_CSV_BYTES = 1024 * 1024
+MAX_ROWS = 5000
+
+_TITLE_YEAR = re.compile(r"^(?P<title>.*?)\s*\((?P<year>\d{4})\)\s*$")
+_OWN_VALUES = {
+    "yes": "Yes",
+    "y": "Yes",
+    "owned": "Yes",
+    "true": "Yes",
+    "1": "Yes",
+    "no": "No",
+    "n": "No",
+    "not owned": "No",
+    "false": "No",
+    "0": "No",
+}
+
+
+@dataclass(frozen=True)
+class OwnershipChange:
+    title: str
+    # None: the title must be unambiguous in the catalog
+    year: Optional[int]
+    own: str
+
+
+@dataclass
+class OwnershipResult:
+    title: str
+    year: Optional[int]
+    # "updated", "unchanged", "not_found", "ambiguous" or "invalid"
+    outcome: str
+    own: str = ""
+    detail: str = ""
+
+    @property
+    def label(self) -> str:
+        return f"{self.title} ({self.year})" if self.year else self.title
+
+
+def parse_own(value: str, default: str) -> Optional[str]:
+    """'Yes'/'No' for the usual spellings, `default` when blank, else None."""
+    value = value.strip().lower()
+    if not value:
+        return default
+    return _OWN_VALUES.get(value)
+
+
+def parse_titles(text: str, own: str) -> List[OwnershipChange]:
+    """
+    Changes from a list like "Godzilla (1954); Mothra (1961)\\nRodan".
+
+    Entries are separated by semicolons or new lines, the year in brackets
+    is optional.
+    """
+    changes = []
+    for entry in re.split(r"[;\n]", text):
+        entry = entry.strip()
+        if not entry:
+            continue
+        match = _TITLE_YEAR.match(entry)
+        if match:
+            changes.append(OwnershipChange(match["title"], int(match["year"]), own))
+        else:
+            changes.append(OwnershipChange(entry, None, own))
+    return changes
+
+
+def parse_csv(
+    data: bytes, own: str
+) -> tuple[List[OwnershipChange], List[OwnershipResult]]:
+    """
+    Changes from CSV rows of title, year and (optionally) own.
+
+    A header row naming "title", "year" and "own" columns may put them in any
+    order; without one the columns are taken in that order. A blank own cell
+    uses `own`.
+
+    Returns:
+        tuple: The valid changes, and an "invalid" result for each bad row.
+
+    Raises:
+        ValueError: If the file is too large or not UTF-8 text.
+    """
+    if len(data) > MAX_CSV_BYTES:
+        raise ValueError(f"CSV is over {MAX_CSV_BYTES // 1024} KB.")
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 text.") from None
+
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(c.strip() for c in row)]
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"CSV has more than {MAX_ROWS} rows.")
+
+    columns = {"title": 0, "year": 1, "own": 2}
+    if rows:
+        header = [c.strip().lower() for c in rows[0]]
+        if "title" in header:
+            columns = {name: header.index(name) for name in columns if name in header}
+            rows = rows[1:]
+
+    def cell(row: List[str], name: str) -> str:
+        pos = columns.get(name)
+        return row[pos].strip() if pos is not None and pos < len(row) else ""
+
+    changes, invalid = [], []
+    for line, row in enumerate(rows, start=1):
+        title, year, status = cell(row, "title"), cell(row, "year"), cell(row, "own")
+        own_value = parse_own(status, own)
+        if not title or (year and not year.isdigit()) or own_value is None:
+            invalid.append(
+                OwnershipResult(
+                    title or f"row {line}", None, "invalid", detail=",".join(row)
+                )
+            )
+            continue
+        changes.append(OwnershipChange(title, int(year) if year else None, own_value))
+    return changes, invalid
+
+
+@dataclass
+class BulkOwnershipReport:
+    results: List[OwnershipResult] = field(default_factory=list)
+
+    def count(self, outcome: str) -> int:
+        return sum(1 for r in self.results if r.outcome == outcome)
+
+    def summary(self, limit: int = 25) -> str:
+        """
+        Totals followed by one line per entry, at most `limit` of them
+        (problems first), short enough for one Discord message.
+        """
+        totals = [
+            f"✅ Updated {self.count('updated')}",
+            f"ℹ️ Unchanged {self.count('unchanged')}",
+        ]
+        problems = [
+            r for r in self.results if r.outcome not in ("updated", "unchanged")
+        ]
+        if problems:
+            totals.append(f"⚠️ Problems {len(problems)}")
+        lines = [", ".join(totals)]
+
+        icons = {"updated": "✅", "unchanged": "ℹ️"}
+        ordered = problems + [
+            r for r in self.results if r.outcome in ("updated", "unchanged")
+        ]
+        for result in ordered[:limit]:
+            icon = icons.get(result.outcome, "⚠️")
+            text = f"{icon} {result.label}: {result.outcome.replace('_', ' ')}"
+            if result.outcome in ("updated", "unchanged"):
+                text += " (owned)" if result.own == "Yes" else " (not owned)"
+            elif result.detail:
+                text += f" ({result.detail})"
+            lines.append(text)
+        if len(ordered) > limit:
+            lines.append(f"... and {len(ordered) - limit} more")
+        return "\n".join(lines)[:2000]
@@ -0,0 +1,546 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.logs import get_logger
+
+from .bulk import OwnershipChange, OwnershipResult
+from .journal import OwnershipJournal
+from .models import METADATA_FIELDS, Movie, normalize_title
+from .search import SearchIndex
+from .stats import CollectionStats
+from .storage import MovieStorage
+
+log = get_logger(__name__)
+
+# Movie fields that can be changed through the journal
+_JOURNALED_FIELDS = ("own", *METADATA_FIELDS)
+# What cached_index returns before the first load
+_EMPTY_INDEX = SearchIndex(())
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    A consistent, read-only view of the catalog at one version.
+    """
+
+    version: int
+    movies: Tuple[Movie, ...]
+
+
+class MovieCatalog:
+    """
+    The movie list, loaded once from storage and kept in memory.
+
+    Rows are indexed by normalized (title, year). Every access asks storage for
+    its cheap change token (file mtime/size, SQLite data_version), and only
+    when that moves is the content digest checked; the list is re-read only if
+    the content actually differs from what was loaded.
+
+    For storage that is expensive to write (the ODS sheet), ownership changes
+    are applied in memory and appended to an `OwnershipJournal` instead.
+    `compact()` persists them and trims the journal; any entries still in the
+    journal are replayed whenever the catalog is loaded. Write-through storage
+    (SQLite) is written directly.
+
+    Updates replace `Movie` objects instead of mutating them, so a snapshot
+    taken before an update never changes underneath its reader.
+
+    With `metadata_from` (a guild's catalog, see `GuildCatalogs`) only the
+    "Own" column is this catalog's: era, studio, TMDB ids and the rest are
+    taken from that catalog whenever this one loads.
+    """
+
+    def __init__(
+        self,
+        storage: MovieStorage,
+        journal_path: Optional[str] = None,
+        metadata_from: Optional["MovieCatalog"] = None,
+    ):
+        self.storage = storage
+        self.metadata_from = metadata_from
+        self.version = 0
+        # Bumped whenever any movie's metadata (not ownership) may have changed
+        self.metadata_version = 0
+        self.journal: Optional[OwnershipJournal] = None
+        if not storage.write_through:
+            self.journal = OwnershipJournal(
+                journal_path or f"{os.path.splitext(storage.path)[0]}.journal.jsonl"
+            )
+        self.pending = 0
+        self._pending_since: Optional[float] = None
+
+        self._loaded = False
+        self._movies: List[Movie] = []
+        self._index: Dict[Tuple[str, int], int] = {}
+        self._search: Optional[SearchIndex] = None
+        # (movies, index) as one reference, for lock-free reads on the event loop
+        self._published: Tuple[List[Movie], Dict[Tuple[str, int], int]] = ([], {})
+        self._stats = CollectionStats()
+        # metadata_from's metadata_version when its metadata was last joined in
+        self._metadata_seen = -1
+        self._token: Any = None
+        self._digest = ""
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+
+    # ---- Loading ---- #
+    def load(self) -> None:
+        """
+        (Re)read the movie list from storage and rebuild the indexes.
+
+        The search index is built here too, off the event loop when called
+        through `AsyncMovieCatalog`; until it is swapped in, `cached_index`
+        keeps returning the previous one.
+        """
+        with self._lock:
+            token = self.storage.change_token()
+            digest = self.storage.digest()
+            movies = self.storage.load_all()
+            if self.metadata_from is not None:
+                movies = self._join_metadata(movies)
+
+            index: Dict[Tuple[str, int], int] = {}
+            for pos, movie in enumerate(movies):
+                index.setdefault(movie.key, pos)
+
+            self._movies = movies
+            self._index = index
+            self._published = (movies, index)
+            self._token = token
+            self._digest = digest
+            self._loaded = True
+
+            # Changes acknowledged but not compacted into storage yet
+            entries = self.journal.entries() if self.journal else []
+            for entry in entries:
+                pos = self._index.get((normalize_title(entry["title"]), entry["year"]))
+                if pos is not None:
+                    changes = {k: entry[k] for k in _JOURNALED_FIELDS if k in entry}
+                    self._movies[pos] = replace(self._movies[pos], **changes)
+            self.pending = len(entries)
+            self._pending_since = time.monotonic() if entries else None
+            self._stats = CollectionStats(self._movies)
+            self._search = SearchIndex(self._movies)
+
+            self.version += 1
+            self.metadata_version += 1
+            log.info(
+                "catalog.loaded",
+                movies=len(movies),
+                storage=self.storage.name,
+                replayed=len(entries),
+                version=self.version,
+            )
+
+    def refresh(self) -> bool:
+        """
+        Reload the movie list if storage changed since it was loaded.
+
+        Returns:
+            bool: True if the catalog was reloaded.
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+                return True
+
+            if self.metadata_from is not None:
+                self.metadata_from.refresh()
+                if self.metadata_from.metadata_version != self._metadata_seen:
+                    self._rejoin_metadata()
+
+            token = self.storage.change_token()
+            if token == self._token:
+                return False
+
+            digest = self.storage.digest()
+            if digest == self._digest:
+                self._token = token
+                return False
+
+            self.load()
+            return True
+
+    def _join_metadata(self, movies: List[Movie]) -> List[Movie]:
+        """
+        `movies` with the metadata of `metadata_from`, keeping their own "Own".
+        Movies it doesn't have keep what storage holds for them.
+        """
+        assert self.metadata_from is not None
+        # Read before the movies: a change in between is joined again later
+        self._metadata_seen = self.metadata_from.metadata_version
+        shared = {movie.key: movie for movie in self.metadata_from.movies()}
+        return [
+            (
+                replace(shared[m.key], title=m.title, year=m.year, own=m.own)
+                if m.key in shared
+                else m
+            )
+            for m in movies
+        ]
+
+    def _rejoin_metadata(self) -> None:
+        """
+        Pick up metadata that changed in `metadata_from` since it was joined,
+        e.g. by enrichment, without reading storage again. Only the movies
+        that changed are touched, in the list and in the stats.
+        """
+        joined = self._join_metadata(self._movies)
+        changed = aliases_changed = 0
+        for pos, (old, new) in enumerate(zip(self._movies, joined)):
+            if old != new:
+                changed += 1
+                aliases_changed += old.aliases != new.aliases
+                self._stats.replace(old, new)
+                self._movies[pos] = new
+        if not changed:
+            return
+        if aliases_changed:
+            # Aliases are processed up front; build the new index before swapping
+            self._search = SearchIndex(self._movies)
+        self.version += 1
+        self.metadata_version += 1
+        log.info("catalog.metadata_joined", changed=changed, path=self.storage.path)
+
+    def _storable(self, movies: Iterable[Movie]) -> List[Movie]:
+        """What to write to storage: just ownership when metadata is joined in."""
+        if self.metadata_from is None:
+            return list(movies)
+        return [Movie(m.title, m.year, m.own) for m in movies]
+
+    def _mark_persisted(self) -> None:
+        # Our own write is not an outside change, don't reload because of it
+        self._token = self.storage.change_token()
+        self._digest = self.storage.digest()
+
+    # ---- Compaction ---- #
+    def needs_compaction(self, max_pending: int = 25, max_age: float = 60.0) -> bool:
+        """
+        True once `max_pending` changes are journaled or the oldest is `max_age` old.
+        """
+        if not self.pending or self._pending_since is None:
+            return False
+        return (
+            self.pending >= max_pending
+            or time.monotonic() - self._pending_since >= max_age
+        )
+
+    def compact(self) -> int:
+        """
+        Write journaled changes into storage and trim them from the journal.
+
+        Storage is written without holding the catalog lock, so ownership
+        updates are not blocked while it runs. Changes made to storage
+        outside the bot are loaded before the snapshot is taken.
+
+        Returns:
+            int: The number of journal entries compacted.
+        """
+        with self._compact_lock:
+            with self._lock:
+                # Load outside edits (replaying the journal over them) first:
+                # the write below is then marked as ours, so an edit it
+                # doesn't include would never be loaded
+                self.refresh()
+                if self.journal is None:
+                    return 0
+                # Entries appended by another process (the shard serving DMs
+                # also writes the shared catalog) are loaded too, so what is
+                # dropped from the journal below is exactly what gets written
+                if len(self.journal.entries()) != self.pending:
+                    self.load()
+                if not self.pending:
+                    return 0
+                snapshot = self._storable(self._movies)
+                count = self.pending
+
+            self.storage.bulk_upsert(snapshot)
+
+            with self._lock:
+                self._mark_persisted()
+                self.journal.drop_first(count)
+                self.pending = max(self.pending - count, 0)
+                self._pending_since = time.monotonic() if self.pending else None
+
+        log.info("catalog.compacted", entries=count, path=self.storage.path)
+        return count
+
+    # ---- Queries ---- #
+    def snapshot(self) -> CatalogSnapshot:
+        with self._lock:
+            self.refresh()
+            return CatalogSnapshot(self.version, tuple(self._movies))
+
+    def movies(self) -> List[Movie]:
+        with self._lock:
+            self.refresh()
+            return list(self._movies)
+
+    def find(self, title: str, year: int) -> Optional[Movie]:
+        with self._lock:
+            self.refresh()
+            pos = self._index.get((normalize_title(title), int(year)))
+            return None if pos is None else self._movies[pos]
+
+    def stats(self) -> CollectionStats:
+        """
+        Owned/total counts by era, decade and studio, kept up to date on every
+        change rather than recounted; the copy is the caller's to keep.
+        """
+        with self._lock:
+            self.refresh()
+            return self._stats.copy()
+
+    def search_index(self) -> SearchIndex:
+        """
+        The keyword index over the current titles, rebuilt only after a reload.
+        """
+        with self._lock:
+            self.refresh()
+            assert self._search is not None
+            return self._search
+
+    def cached_index(self) -> SearchIndex:
+        """
+        The keyword index without checking storage for changes first.
+
+        Used on hot paths like autocomplete, which must never touch the disk
+        or build anything: the index is built by `load`, and until a rebuild
+        is swapped in the previous one is returned. Before the first load
+        finishes the index is empty.
+        """
+        search = self._search
+        return _EMPTY_INDEX if search is None else search
+
+    def cached_search(self, keyword: str = "") -> Tuple[int, Tuple[Movie, ...]]:
+        """
+        Search the in-memory index without checking storage, returning the
+        catalog version the results belong to. Never waits for the lock.
+        """
+        # Read the version first: results may then be newer than it, never older
+        version = self.version
+        return version, tuple(self.cached_index().search(keyword))
+
+    def cached_movie(self, title: str, year: Optional[int] = None) -> Optional[Movie]:
+        """
+        A catalog movie from memory only, safe to call on the event loop: it
+        never waits for the lock, a reload in progress just isn't seen yet.
+
+        Without a year the title must be unambiguous (only one release year in
+        the catalog). Returns None when the movie isn't known.
+        """
+        if year is None:
+            years = self.cached_index().years_for(title)
+            if len(years) != 1:
+                return None
+            year = years[0]
+        movies, index = self._published
+        pos = index.get((normalize_title(title), int(year)))
+        return None if pos is None else movies[pos]
+
+    def search(self, keyword: str = "", fuzzy: bool = True) -> List[Movie]:
+        return self.search_index().search(keyword, fuzzy=fuzzy)
+
+    def list_movies(self, keyword: str = "") -> List[dict]:
+        return [movie.to_dict() for movie in self.search(keyword)]
+
+    # ---- Updates ---- #
+    def set_ownership(self, title: str, year: int, own_status: str) -> str:
+        """
+        Updates the 'Own' column for a movie to 'Yes' or 'No'.
+        Returns a message describing the results.
+        """
+        with self._lock:
+            self.refresh()
+            pos = self._index.get((normalize_title(title), int(year)))
+
+            if pos is None:
+                return f"ℹ️ Information: Could not find {title} ({year})"
+
+            movie = self._movies[pos]
+            current_status = movie.own.lower()
+            desired_status = own_status.lower()
+
+            if current_status == desired_status:
+                if desired_status == "yes":
+                    return f"ℹ️ Already own {title} ({year})."
+                else:
+                    return f"ℹ️ Did not own {title} ({year})."
+
+            if self.journal is None:
+                self.storage.set_ownership(movie.title, movie.year, own_status)
+                self._mark_persisted()
+            else:
+                self._journal(movie, own=own_status)
+            self._movies[pos] = replace(movie, own=own_status)
+            self._stats.replace(movie, self._movies[pos])
+            self.version += 1
+
+            if desired_status == "yes":
+                return f"✅  Update: {title} ({year}) marked as owned."
+            else:
+                return f"✅ Update: {title} ({year}) marked as not owned."
+
+    def set_ownership_many(
+        self, changes: Sequence[OwnershipChange]
+    ) -> List[OwnershipResult]:
+        """
+        Apply many ownership changes with a single storage write.
+
+        Every entry is checked against the index first: entries without a
+        year must be unambiguous, unknown titles get a "did you mean"
+        suggestion. The valid changes are then written together, in one
+        SQLite transaction or one journal append.
+
+        Returns:
+            List[OwnershipResult]: One result per entry, in order.
+        """
+        with self._lock:
+            self.refresh()
+            index = self.search_index()
+            results: List[OwnershipResult] = []
+            updated: Dict[int, Movie] = {}
+
+            for change in changes:
+                year = change.year
+                if year is None:
+                    years = index.years_for(change.title)
+                    if len(years) > 1:
+                        results.append(
+                            OwnershipResult(
+                                change.title,
+                                None,
+                                "ambiguous",
+                                detail="add a year: " + ", ".join(map(str, years)),
+                            )
+                        )
+                        continue
+                    year = years[0] if years else None
+
+                pos = None
+                if year is not None:
+                    pos = self._index.get((normalize_title(change.title), year))
+                if pos is None:
+                    match = index.resolve(change.title, year)
+                    detail = (
+                        f"did you mean {match.movie.title} ({match.movie.year})?"
+                        if match
+                        else ""
+                    )
+                    results.append(
+                        OwnershipResult(change.title, year, "not_found", detail=detail)
+                    )
+                    continue
+
+                movie = updated.get(pos, self._movies[pos])
+                if movie.own.lower() == change.own.lower():
+                    results.append(
+                        OwnershipResult(movie.title, movie.year, "unchanged", movie.own)
+                    )
+                    continue
+                updated[pos] = replace(movie, own=change.own)
+                results.append(
+                    OwnershipResult(movie.title, movie.year, "updated", change.own)
+                )
+
+            if updated:
+                if self.journal is None:
+                    self.storage.bulk_upsert(self._storable(updated.values()))
+                    self._mark_persisted()
+                else:
+                    self.journal.extend(
+                        (m.title, m.year, {"own": m.own}) for m in updated.values()
+                    )
+                    self.pending += len(updated)
+                    if self._pending_since is None:
+                        self._pending_since = time.monotonic()
+                for pos, movie in updated.items():
+                    self._stats.replace(self._movies[pos], movie)
+                    self._movies[pos] = movie
+                self.version += 1
+
+            log.info(
+                "catalog.bulk_ownership",
+                entries=len(changes),
+                updated=len(updated),
+                storage=self.storage.name,
+            )
+            return results
+
+    def _journal(self, movie: Movie, **changes: Any) -> None:
+        assert self.journal is not None
+        self.journal.append(movie.title, movie.year, **changes)
+        self.pending += 1
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def set_metadata(
+        self,
+        title: str,
+        year: int,
+        tmdb_id: int,
+        poster_path: str,
+        runtime: int,
+        aliases: str = "",
+        studio: str = "",
+    ) -> bool:
+        """
+        Pin TMDB metadata onto a movie so later lookups can skip the search.
+        Empty `aliases` or `studio` keep the movie's current ones.
+
+        Returns:
+            bool: False if the movie isn't in the catalog.
+        """
+        with self._lock:
+            self.refresh()
+            pos = self._index.get((normalize_title(title), int(year)))
+            if pos is None:
+                return False
+
+            changes = {
+                "tmdb_id": int(tmdb_id),
+                "poster_path": poster_path or "",
+                "runtime": int(runtime or 0),
+                "aliases": aliases or self._movies[pos].aliases,
+                "studio": studio or self._movies[pos].studio,
+            }
+            movie = replace(self._movies[pos], **changes)
+            if self.journal is None:
+                self.storage.bulk_upsert([movie])
+                self._mark_persisted()
+            else:
+                self._journal(movie, **changes)
+            self._stats.replace(self._movies[pos], movie)
+            self._movies[pos] = movie
+            self.version += 1
+            self.metadata_version += 1
+            return True
+
+    # ---- Import / Export ---- #
+    def import_from(self, source: MovieStorage) -> int:
+        """
+        Upsert every movie from another backend into this catalog's storage.
+
+        Pending journal entries are compacted first so they aren't lost.
+
+        Returns:
+            int: The number of movies imported.
+        """
+        self.compact()
+        with self._lock:
+            count = self.storage.bulk_upsert(source.load_all())
+            self.load()
+        return count
+
+    def export_to(self, target: MovieStorage) -> int:
+        """
+        Write the current catalog, including journaled changes, into another backend.
+
+        Returns:
+            int: The number of movies exported.
+        """
+        return target.bulk_upsert(self.movies())
@@ -0,0 +1,162 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from utils.logs import get_logger
+from utils.tmdb.async_tmdb_api import AsyncTMDbAPI
+from utils.tmdb.scheduler import background_priority
+
+from .async_catalog import AsyncMovieCatalog
+from .models import ALIAS_SEPARATOR, Movie, normalize_title
+
+log = get_logger(__name__)
+
+# Alternate titles kept per movie, TMDB lists dozens for the famous ones
+MAX_ALIASES = 10
+
+
+@dataclass
+class EnrichmentReport:
+    resolved: int = 0
+    # Already had a tmdb_id, e.g. from an earlier, interrupted run
+    skipped: int = 0
+    not_found: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [
+            f"✅ Resolved {self.resolved} movies, skipped {self.skipped} already enriched."
+        ]
+        if self.not_found:
+            lines.append(
+                f"ℹ️ Not found on TMDB ({len(self.not_found)}): "
+                + ", ".join(self.not_found[:10])
+                + (" ..." if len(self.not_found) > 10 else "")
+            )
+        if self.failed:
+            lines.append(
+                f"⚠️ Failed ({len(self.failed)}): "
+                + ", ".join(self.failed[:10])
+                + (" ..." if len(self.failed) > 10 else "")
+            )
+        return "\n".join(lines)
+
+
+def collect_aliases(movie: Movie, details: Dict[str, Any]) -> str:
+    """
+    The movie's current aliases plus TMDB's original and alternate titles.
+
+    Only titles in Latin script are kept, those are the ones people type;
+    aliases entered by hand come first and are never dropped.
+    """
+    alternates = details.get("alternative_titles", {}).get("titles", [])
+    names = [
+        *movie.alias_list,
+        details.get("original_title") or "",
+        *(t.get("title") or "" for t in alternates),
+    ]
+
+    seen = {normalize_title(movie.title)}
+    aliases: List[str] = []
+    for name in names:
+        name = name.strip()
+        key = normalize_title(name)
+        if not name or "|" in name or not name.isascii() or key in seen:
+            continue
+        seen.add(key)
+        aliases.append(name)
+    return ALIAS_SEPARATOR.join(aliases[: max(MAX_ALIASES, len(movie.alias_list))])
+
+
+async def enrich_movie(
+    async_catalog: AsyncMovieCatalog, tmdb: AsyncTMDbAPI, movie: Movie
+) -> bool:
+    """
+    Resolve one catalog movie on TMDB and pin its id, poster, runtime,
+    alternate titles and studio.
+
+    Returns:
+        bool: False if TMDB had no sufficiently close match.
+    """
+    match = await tmdb.get_movie_by_title(movie.title, movie.year or None)
+    if match is None or match.get("id") is None:
+        return False
+
+    details = await tmdb.get_movie_details(match["id"], append=["alternative_titles"])
+    await async_catalog.set_metadata(
+        movie.title,
+        movie.year,
+        match["id"],
+        details.get("poster_path") or match.get("poster_path") or "",
+        details.get("runtime") or 0,
+        collect_aliases(movie, details),
+        next(
+            (
+                c["name"]
+                for c in details.get("production_companies", [])
+                if c.get("name")
+            ),
+            "",
+        ),
+    )
+    return True
+
+
+async def enrich_catalog(
+    async_catalog: AsyncMovieCatalog,
+    tmdb: AsyncTMDbAPI,
+    concurrency: int = 4,
+    force: bool = False,
+) -> EnrichmentReport:
+    """
+    Resolve every catalog movie to a TMDB id and store it with the movie.
+
+    Requests run at background priority so /movie info isn't held up, and each
+    result is persisted as soon as it arrives. Movies that already have an id
+    are skipped, so an interrupted run picks up where it left off.
+
+    Parameters:
+        async_catalog (AsyncMovieCatalog): The catalog to enrich.
+        tmdb (AsyncTMDbAPI): A started TMDB client.
+        concurrency (int, default=4): Movies resolved at the same time.
+        force (bool, default=False): Re-resolve movies that already have an id.
+
+    Returns:
+        EnrichmentReport: What was resolved, skipped, not found or failed.
+    """
+    snapshot = await async_catalog.snapshot()
+    report = EnrichmentReport()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(movie: Movie) -> None:
+        label = f"{movie.title} ({movie.year})"
+        async with semaphore:
+            try:
+                found = await enrich_movie(async_catalog, tmdb, movie)
+            except Exception as e:
+                log.warning("enrich.failed", movie=label, error=repr(e))
+                report.failed.append(label)
+                return
+        if found:
+            report.resolved += 1
+        else:
+            report.not_found.append(label)
+
+    todo = []
+    for movie in snapshot.movies:
+        if movie.tmdb_id and not force:
+            report.skipped += 1
+        else:
+            todo.append(movie)
+
+    with background_priority():
+        await asyncio.gather(*(run(movie) for movie in todo))
+
+    log.info(
+        "enrich.finished",
+        resolved=report.resolved,
+        skipped=report.skipped,
+        not_found=len(report.not_found),
+        failed=len(report.failed),
+    )
+    return report
@@ -0,0 +1,131 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.logs import get_logger
+
+from .async_catalog import AsyncMovieCatalog
+from .catalog import MovieCatalog
+from .models import Movie
+from .storage import open_storage
+
+log = get_logger(__name__)
+
+
+class GuildCatalogs:
+    """
+    One ownership collection per guild.
+
+    Every guild works from the same movie list but tracks its own "Own"
+    column: its catalog lives in `directory` as "<guild id>.ods" or
+    ".sqlite3", created with one unowned title/year row per shared movie the
+    first time the guild uses a movie command. Movies added to the shared
+    list later are added, unowned, whenever the guild's catalog is opened.
+    Everything but ownership (era, studio, TMDB ids, ...) is joined in from
+    the shared catalog, so enrichment shows up in every guild.
+
+    The home guild, and DMs, use the shared catalog itself, so a single
+    guild deployment keeps working on the original file. A guild is only
+    ever served by one shard, so with several processes each guild file is
+    still written by one process only. The shared file is compacted only by
+    the process serving the home guild; the one serving DMs may append to
+    its journal, and those entries are picked up when it compacts.
+    """
+
+    def __init__(
+        self,
+        default: AsyncMovieCatalog,
+        home_guild: Optional[int],
+        backend: str,
+        sheet: str,
+        directory: str = "./src/guilds",
+        max_workers: int = 4,
+    ):
+        self.default = default
+        self.home_guild = home_guild
+        self.backend = backend
+        self.sheet = sheet
+        self.directory = directory
+        self._catalogs: Dict[int, AsyncMovieCatalog] = {}
+        self._opening: Dict[int, asyncio.Lock] = {}
+        # Shared by every guild catalog, instead of a thread pool each
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="guild-catalog"
+        )
+
+    def uses_default(self, guild_id: Optional[int]) -> bool:
+        return guild_id is None or guild_id == self.home_guild
+
+    def path_for(self, guild_id: int) -> str:
+        ext = ".sqlite3" if self.backend == "sqlite" else ".ods"
+        return os.path.join(self.directory, f"{guild_id}{ext}")
+
+    def peek(self, guild_id: Optional[int]) -> Optional[AsyncMovieCatalog]:
+        """The guild's catalog if it is already open, without opening it."""
+        if self.uses_default(guild_id):
+            return self.default
+        return self._catalogs.get(guild_id)  # type: ignore[arg-type]
+
+    async def get(self, guild_id: Optional[int]) -> AsyncMovieCatalog:
+        """
+        The catalog holding `guild_id`'s ownership, opened on first use.
+        """
+        catalog = self.peek(guild_id)
+        if catalog is not None:
+            return catalog
+
+        assert guild_id is not None
+        lock = self._opening.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            catalog = self._catalogs.get(guild_id)
+            if catalog is None:
+                loop = asyncio.get_running_loop()
+                opened = await loop.run_in_executor(
+                    self._executor, self._open, guild_id
+                )
+                catalog = AsyncMovieCatalog(opened, executor=self._executor)
+                self._catalogs[guild_id] = catalog
+        self._opening.pop(guild_id, None)
+        return catalog
+
+    def _open(self, guild_id: int) -> MovieCatalog:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(guild_id)
+        created = not os.path.exists(path)
+        storage = open_storage(self.backend, path, self.sheet)
+
+        # New guilds start with nothing owned; only ownership is stored
+        known = {movie.key for movie in storage.load_all()}
+        missing = [
+            Movie(movie.title, movie.year, "No")
+            for movie in self.default.catalog.movies()
+            if movie.key not in known
+        ]
+        if missing:
+            storage.bulk_upsert(missing)
+
+        log.info(
+            "guild_catalog.opened",
+            guild=guild_id,
+            path=path,
+            created=created,
+            added=len(missing),
+        )
+        return MovieCatalog(storage, metadata_from=self.default.catalog)
+
+    def opened(self) -> List[AsyncMovieCatalog]:
+        """The shared catalog and every guild catalog opened so far."""
+        return [self.default, *self._catalogs.values()]
+
+    def close(self) -> None:
+        """
+        Close every guild catalog and their thread pool; the shared catalog
+        is its owner's to close.
+        """
+        # Finish queued work before the storage it uses is closed
+        self._executor.shutdown(wait=True)
+        for catalog in self._catalogs.values():
+            catalog.close()
+        # Nothing else holds on to them, caches keyed by catalog drop theirs too
+        self._catalogs.clear()
@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from utils.logs import get_logger
+
+log = get_logger(__name__)
+
+
+class OwnershipJournal:
+    """
+    Append-only JSON Lines log of ownership changes.
+
+    Every change is flushed and fsync'd before `append` returns, so it survives
+    a crash even though the spreadsheet itself is only rewritten during
+    compaction. Entries hold the movie's title and year plus the fields that
+    changed:
+
+        {"ts": 1700000000.0, "title": "Godzilla", "year": 1954, "own": "Yes"}
+        {"ts": 1700000001.0, "title": "Godzilla", "year": 1954, "tmdb_id": 1678}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, title: str, year: int, **changes: Any) -> None:
+        self.extend([(title, year, changes)])
+
+    def extend(self, entries: Iterable[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """
+        Append several (title, year, changes) entries with a single fsync.
+        """
+        now = time.time()
+        lines = [
+            json.dumps(
+                {"ts": now, "title": title, "year": int(year), **changes},
+                ensure_ascii=False,
+            )
+            + "\n"
+            for title, year, changes in entries
+        ]
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def entries(self) -> List[dict]:
+        """
+        Read back every entry.
+
+        A torn line left by an interrupted write is dropped and the file is
+        rewritten without it, so later appends start on a clean line.
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return []
+            entries = []
+            damaged = False
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        log.warning("journal.unreadable_entry", line=line)
+                        damaged = True
+
+            if damaged:
+                self._rewrite(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+            return entries
+
+    def drop_first(self, count: int) -> None:
+        """
+        Remove the first `count` entries once they have been compacted.
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, encoding="utf-8") as f:
+                remaining = f.readlines()[count:]
+            self._rewrite(remaining)
+
+    def _rewrite(self, lines: Iterable[str]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Fields filled in by the TMDB enrichment job
+METADATA_FIELDS = ("tmdb_id", "poster_path", "runtime", "aliases", "studio")
+
+# Separates the original and alternate titles in `Movie.aliases`
+ALIAS_SEPARATOR = " | "
+
+
+def normalize_title(title: str) -> str:
+    """
+    Lowercase a title and collapse whitespace so lookups ignore spacing and case.
+    """
+    return " ".join(str(title).strip().lower().split())
+
+
+@dataclass
+class Movie:
+    title: str
+    year: int
+    own: str
+    era: str = ""
+    description: str = ""
+    tmdb_id: Optional[int] = None
+    poster_path: str = ""
+    runtime: int = 0
+    # Original and alternate titles, e.g. "Gojira | Godzilla, King of the Monsters!"
+    aliases: str = ""
+    # Main production company
+    studio: str = ""
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (normalize_title(self.title), self.year)
+
+    @property
+    def owned(self) -> bool:
+        return self.own.strip().lower() == "yes"
+
+    @property
+    def alias_list(self) -> List[str]:
+        return [a.strip() for a in self.aliases.split("|") if a.strip()]
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "year": self.year, "own": self.own}
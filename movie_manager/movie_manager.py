@@ -1,13 +1,53 @@
-import pandas as pd
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from .async_catalog import AsyncMovieCatalog
+from .catalog import MovieCatalog
+from .guilds import GuildCatalogs
+from .storage import MovieStorage, open_storage
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 ODS_file = "./src/GodZilla_Films.ods"
+SQLITE_file = "./src/GodZilla_Films.sqlite3"
 movie_sheet = "Movie List"
+GUILDS_DIR = "./src/guilds"
+
+# "ods" (default) or "sqlite", the other format is an import/export target
+STORAGE_BACKEND = os.getenv("MOVIE_STORAGE", "ods").lower()
+
+
+def storage_path(kind: str) -> str:
+    return SQLITE_file if kind == "sqlite" else ODS_file
+
+
+def make_storage(kind: str) -> MovieStorage:
+    return open_storage(kind, storage_path(kind), movie_sheet)
+
+
+# Loaded once, then kept in memory and reloaded only when storage changes
+catalog = MovieCatalog(make_storage(STORAGE_BACKEND))
+# What coroutines should use: storage work runs off the event loop
+async_catalog = AsyncMovieCatalog(catalog)
+# Per-guild ownership; the home guild (GUILD_ID) uses the catalog above
+guild_catalogs = GuildCatalogs(
+    async_catalog,
+    int(os.environ["GUILD_ID"]) if os.getenv("GUILD_ID") else None,
+    STORAGE_BACKEND,
+    movie_sheet,
+    GUILDS_DIR,
+)
 
 
 def load_movies_df() -> pd.DataFrame:
     """
     Returns the movies DataFrame from an ODS file
     """
+    import pandas as pd
+
     return pd.read_excel(ODS_file, sheet_name=movie_sheet, engine="odf")
 
 
@@ -16,38 +56,7 @@ def set_ownership(title: str, year: int, own_status: str) -> str:
     Updates the 'Own' column for a movie to 'Yes' or 'No'.
     Returns a message describing the results.
     """
-
-    # read ODS
-    df = load_movies_df()
-    df = df.reset_index(drop=True)
-    df.index = range(1, len(df) + 1)
-
-    # Normalize
-    mask = (df["Year"].astype(int) == int(year)) & (
-        df["Title"].str.lower() == title.lower()
-    )
-    print("Mask value: ", mask)
-
-    if not mask.any():
-        return f"ℹ️ Information: Could not find {title} ({year})"
-
-    idx = df.index[mask][0]
-    current_status = df.at[idx, "Own"].strip().lower()
-    desitred_status = own_status.lower()
-
-    if current_status == desitred_status:
-        if desitred_status == "yes":
-            return f"ℹ️ Already own {title} ({year})."
-        else:
-            return f"ℹ️ Did not own {title} ({year})."
-
-    df.at[idx, "Own"] = own_status
-    df.to_excel(ODS_file, engine="odf", index=False, sheet_name=movie_sheet)  # type: ignore
-
-    if desitred_status == "yes":
-        return f"✅  Update: {title} ({year}) marked as owned."
-    else:
-        return f"✅ Update: {title} ({year}) marked as not owned."
+    return catalog.set_ownership(title, year, own_status)
 
 
 def update_movie(title: str = "default", year: int = 0):
@@ -63,15 +72,4 @@ def list_movies(keyword: str = "") -> list[dict]:
     Returns a formatted string of all movies contianing the keyword.
     If no keyword is given, returns all movies.
     """
-    df = load_movies_df()
-
-    if keyword:
-        mask = df["Title"].str.strip().str.lower().str.contains(keyword.lower())
-        df = df[mask]
-
-    movies = []
-
-    for _, row in df.iterrows():
-        movies.append({"title": row["Title"], "year": row["Year"], "own": row["Own"]})
-
-    return movies
+    return catalog.list_movies(keyword)
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.logs import get_logger
+from utils.metrics import metrics
+from utils.tmdb.async_tmdb_api import AsyncTMDbAPI
+
+from .catalog import MovieCatalog
+from .models import Movie
+
+log = get_logger(__name__)
+
+
+@dataclass
+class Resolution:
+    """
+    Which TMDB movie a title query refers to, and how that was decided.
+
+    `source` is "catalog" when the query matched a catalog title or alias,
+    "tmdb" when TMDB's search had to pick, and "none" when neither found it.
+    """
+
+    source: str
+    tmdb_id: Optional[int] = None
+    # The catalog movie and the title or alias that matched it
+    movie: Optional[Movie] = None
+    matched: str = ""
+    score: float = 0.0
+    # Whether a TMDB search request was made
+    searched: bool = False
+
+    def describe(self) -> str:
+        if self.source == "catalog" and self.movie is not None:
+            return f'Matched "{self.matched}" in the catalog'
+        if self.source == "tmdb":
+            return "Found through TMDB search"
+        return "Not found"
+
+
+async def resolve_movie(
+    catalog: MovieCatalog,
+    tmdb: AsyncTMDbAPI,
+    title: str,
+    year: Optional[int] = None,
+    cutoff: float = 85.0,
+) -> Resolution:
+    """
+    Resolve a (possibly misspelled) title to a TMDB id, catalog first.
+
+    The query is matched against the in-memory catalog titles and aliases.
+    An enriched match answers without any TMDB request; a match that isn't
+    enriched yet is searched on TMDB under its catalog title, which finds the
+    right film far more reliably than the misspelled query. Only queries the
+    catalog doesn't know, or can't tell apart, go to TMDB search as typed.
+
+    Parameters:
+        catalog (MovieCatalog): Only its in-memory index is used.
+        tmdb (AsyncTMDbAPI): A started TMDB client.
+        title (str): Title as typed by the user.
+        year (Optional[int]): Optional release year.
+        cutoff (float, default=85.0): Minimum local match score, 0-100.
+    """
+    match = catalog.cached_index().resolve(title, year, cutoff)
+    if match is not None:
+        movie = match.movie
+        resolution = Resolution(
+            "catalog", movie.tmdb_id, movie, match.name, match.score
+        )
+        if movie.tmdb_id is None:
+            result = await tmdb.get_movie_by_title(movie.title, movie.year or None)
+            resolution.tmdb_id = result.get("id") if result else None
+            resolution.searched = True
+    else:
+        result = await tmdb.get_movie_by_title(title, year)
+        resolution = Resolution(
+            "tmdb" if result else "none",
+            result.get("id") if result else None,
+            searched=True,
+        )
+
+    metrics.incr("resolve", resolution.source)
+    log.debug(
+        "movie.resolved",
+        query=title,
+        year=year,
+        source=resolution.source,
+        matched=resolution.matched,
+        score=round(resolution.score, 1),
+        tmdb_id=resolution.tmdb_id,
+        searched=resolution.searched,
+    )
+    return resolution
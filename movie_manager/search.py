@@ -0,0 +1,207 @@
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+
+from .models import Movie
+
+
+def search_text(text: str) -> str:
+    """
+    Normalize text for searching: lowercase, punctuation stripped, single spaces.
+    """
+    return " ".join(default_process(str(text)).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class TitleMatch:
+    movie: Movie
+    # The title or alias that matched
+    name: str
+    score: float
+
+
+class SearchIndex:
+    """
+    Prebuilt keyword index over the catalog titles.
+
+    Substring queries are answered from a trigram inverted index: the postings
+    of the query's trigrams are intersected to narrow the candidates and a
+    substring check confirms them. When nothing matches, all titles are scored
+    in one batched rapidfuzz pass and those above `fuzzy_cutoff` are returned,
+    best first, so typos like "Godzila" still find something. Catalogs larger
+    than `prefilter_size` only fuzzy-score the titles sharing the most trigrams.
+
+    A sorted title list backs prefix lookups for slash command autocomplete.
+    Titles and aliases (original and alternate titles) are also processed up
+    front for `resolve`, which picks the one movie a query refers to.
+    """
+
+    def __init__(
+        self,
+        movies: Sequence[Movie],
+        fuzzy_cutoff: float = 80.0,
+        prefilter_size: int = 500,
+    ):
+        # The catalog's own list: rows replaced by ownership updates show up here
+        self.movies = movies
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.prefilter_size = prefilter_size
+        self.titles: List[str] = [search_text(m.title) for m in self.movies]
+
+        self.grams: Dict[str, Set[int]] = defaultdict(set)
+        self.by_title: Dict[str, List[int]] = defaultdict(list)
+        for pos, title in enumerate(self.titles):
+            self.by_title[title].append(pos)
+            for gram in trigrams(title):
+                self.grams[gram].add(pos)
+
+        self.sorted_titles: List[Tuple[str, int]] = sorted(
+            (title, pos) for pos, title in enumerate(self.titles)
+        )
+
+        # Every name a movie goes by, processed once: (processed, position, name)
+        self.names: List[Tuple[str, int, str]] = [
+            (title, pos, movie.title)
+            for pos, (title, movie) in enumerate(zip(self.titles, self.movies))
+        ]
+        for pos, movie in enumerate(self.movies):
+            for alias in movie.alias_list:
+                processed = search_text(alias)
+                if processed:
+                    self.names.append((processed, pos, alias))
+
+    def _candidates(self, needle: str) -> Sequence[int]:
+        if len(needle) < 3:
+            return range(len(self.titles))
+
+        postings = sorted(
+            (self.grams.get(gram, set()) for gram in trigrams(needle)), key=len
+        )
+        if not postings[0]:
+            return []
+        return sorted(set.intersection(*postings))
+
+    def _substring(self, needle: str) -> List[int]:
+        return [pos for pos in self._candidates(needle) if needle in self.titles[pos]]
+
+    def _fuzzy(self, needle: str, limit: int) -> List[int]:
+        choices: Dict[int, str] | List[str] = self.titles
+        if len(self.titles) > self.prefilter_size:
+            # Large catalogs: only score the titles sharing the most trigrams
+            overlap: Counter[int] = Counter()
+            for gram in trigrams(needle):
+                overlap.update(self.grams.get(gram, ()))
+            choices = {
+                pos: self.titles[pos]
+                for pos, _ in overlap.most_common(self.prefilter_size)
+            }
+
+        matches = process.extract(
+            needle,
+            choices,
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=self.fuzzy_cutoff,
+            limit=limit,
+        )
+        return [pos for _, _, pos in matches]
+
+    def search(self, keyword: str, fuzzy: bool = True, limit: int = 50) -> List[Movie]:
+        """
+        Return movies matching `keyword`, or every movie when it is empty.
+
+        Parameters:
+            keyword (str): Text to look for in titles.
+            fuzzy (bool, default=True): Fall back to fuzzy matching when nothing
+                contains the keyword.
+            limit (int, default=50): Maximum number of fuzzy matches.
+        """
+        needle = search_text(keyword)
+        if not needle:
+            return list(self.movies)
+
+        positions = self._substring(needle)
+        if not positions and fuzzy:
+            positions = self._fuzzy(needle, limit)
+        return [self.movies[pos] for pos in positions]
+
+    # ---- Autocomplete ---- #
+    def _prefix(self, needle: str, limit: int) -> List[int]:
+        positions = []
+        i = bisect_left(self.sorted_titles, (needle, -1))
+        while i < len(self.sorted_titles) and len(positions) < limit:
+            title, pos = self.sorted_titles[i]
+            if not title.startswith(needle):
+                break
+            positions.append(pos)
+            i += 1
+        return positions
+
+    def suggest(self, text: str, limit: int = 25) -> List[Movie]:
+        """
+        Titles for autocomplete: prefix matches first, then other substring
+        matches, then fuzzy matches, at most `limit` in total.
+        """
+        needle = search_text(text)
+        if not needle:
+            return list(self.movies[:limit])
+
+        seen: Dict[int, None] = dict.fromkeys(self._prefix(needle, limit))
+        if len(seen) < limit:
+            seen.update(dict.fromkeys(self._substring(needle)))
+        if len(seen) < limit:
+            seen.update(dict.fromkeys(self._fuzzy(needle, limit)))
+        return [self.movies[pos] for pos in list(seen)[:limit]]
+
+    # ---- Resolution ---- #
+    def resolve(
+        self, query: str, year: Optional[int] = None, cutoff: float = 85.0
+    ) -> Optional[TitleMatch]:
+        """
+        The movie `query` most likely refers to, by title or alias.
+
+        Returns None when nothing scores at least `cutoff`, or when the best
+        score is shared by different movies (e.g. "Godzilla" without a year).
+        """
+        needle = search_text(query)
+        if not needle:
+            return None
+
+        choices = {
+            i: processed
+            for i, (processed, pos, _) in enumerate(self.names)
+            if year is None or self.movies[pos].year == year
+        }
+        matches = process.extract(
+            needle,
+            choices,
+            scorer=fuzz.token_sort_ratio,
+            processor=None,
+            score_cutoff=cutoff,
+            limit=10,
+        )
+        if not matches:
+            return None
+
+        best_score = matches[0][1]
+        best = {self.names[i][1] for _, score, i in matches if score == best_score}
+        if len(best) > 1:
+            return None
+        _, pos, name = self.names[matches[0][2]]
+        return TitleMatch(self.movies[pos], name, best_score)
+
+    def years_for(self, title: str) -> List[int]:
+        """
+        Release years of every movie with exactly this (normalized) title.
+        """
+        return sorted(
+            {self.movies[pos].year for pos in self.by_title.get(search_text(title), [])}
+        )
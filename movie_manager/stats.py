@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+from .models import Movie
+
+UNKNOWN = "Unknown"
+
+
+def _era(movie: Movie) -> str:
+    return movie.era or UNKNOWN
+
+
+def _decade(movie: Movie) -> str:
+    return f"{movie.year // 10 * 10}s" if movie.year else UNKNOWN
+
+
+def _studio(movie: Movie) -> str:
+    return movie.studio or UNKNOWN
+
+
+# Dimension -> the group a movie counts towards
+DIMENSIONS: Dict[str, Callable[[Movie], str]] = {
+    "era": _era,
+    "decade": _decade,
+    "studio": _studio,
+}
+
+
+@dataclass(frozen=True)
+class GroupStats:
+    name: str
+    owned: int
+    total: int
+
+    @property
+    def unowned(self) -> int:
+        return self.total - self.owned
+
+    @property
+    def percent(self) -> float:
+        return self.owned / self.total * 100 if self.total else 0.0
+
+
+class CollectionStats:
+    """
+    Owned and total counts per era, decade and studio.
+
+    Built once when the catalog loads, then kept current by `replace()` on
+    every change, which only touches the groups of the one movie involved;
+    a /movie stats request just reads the counters.
+    """
+
+    def __init__(self, movies: Iterable[Movie] = ()):
+        # dimension -> group -> [owned, total]
+        self.groups: Dict[str, Dict[str, List[int]]] = {d: {} for d in DIMENSIONS}
+        self.owned = 0
+        self.total = 0
+        for movie in movies:
+            self._count(movie, 1)
+
+    def _count(self, movie: Movie, sign: int) -> None:
+        owned = sign if movie.owned else 0
+        self.owned += owned
+        self.total += sign
+        for dimension, group_of in DIMENSIONS.items():
+            groups = self.groups[dimension]
+            counts = groups.setdefault(group_of(movie), [0, 0])
+            counts[0] += owned
+            counts[1] += sign
+            if counts[1] <= 0:
+                del groups[group_of(movie)]
+
+    def replace(self, old: Movie, new: Movie) -> None:
+        self._count(old, -1)
+        self._count(new, 1)
+
+    def by(self, dimension: str) -> List[GroupStats]:
+        """Groups of one dimension, eras and studios by size, decades in order."""
+        rows = [
+            GroupStats(name, owned, total)
+            for name, (owned, total) in self.groups[dimension].items()
+        ]
+        if dimension == "decade":
+            return sorted(rows, key=lambda g: g.name)
+        return sorted(rows, key=lambda g: (-g.total, g.name))
+
+    def overall(self) -> GroupStats:
+        return GroupStats("All", self.owned, self.total)
+
+    def copy(self) -> "CollectionStats":
+        stats = CollectionStats()
+        stats.groups = {
+            d: {name: list(counts) for name, counts in groups.items()}
+            for d, groups in self.groups.items()
+        }
+        stats.owned, stats.total = self.owned, self.total
+        return stats
+
+
+def format_stats(rows: List[GroupStats], limit: int = 15) -> str:
+    """
+    Code block table of owned/unowned counts, short enough for an embed field.
+    """
+    lines = [f"{'':<18} {'own':>4} {'miss':>4} {'%':>5}"]
+    for row in rows[:limit]:
+        lines.append(
+            f"{row.name[:18]:<18} {row.owned:>4} {row.unowned:>4} {row.percent:>5.1f}"
+        )
+    if len(rows) > limit:
+        lines.append(f"... {len(rows) - limit} more")
+    return "```\n" + "\n".join(lines) + "\n```"
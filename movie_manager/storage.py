@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
+
+from .models import Movie, normalize_title
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _pandas():
+    # pandas, numpy and odfpy take about a third of a second to import, and
+    # only the ODS backend needs them, so they are loaded on its first read
+    import pandas
+
+    return pandas
+
+
+# Columns every movie sheet has, see README "`.ods` File Setup"
+ODS_COLUMNS = ["Own", "Title", "Year", "Movie Era", "Description"]
+# Optional columns written by the TMDB enrichment job
+ODS_METADATA_COLUMNS = {
+    "tmdb_id": "TMDb ID",
+    "poster_path": "Poster Path",
+    "runtime": "Runtime",
+    "aliases": "Also Known As",
+    "studio": "Studio",
+}
+
+
+class MovieStorage(ABC):
+    """
+    Where the movie list is persisted.
+
+    `MovieCatalog` keeps the working copy in memory and only talks to storage to
+    load, to detect outside changes and to persist updates. Backends that can
+    write a single row cheaply set `write_through` so the catalog writes to them
+    directly instead of journaling.
+    """
+
+    name: str = ""
+    write_through: bool = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def load_all(self) -> List[Movie]:
+        """Return every movie in storage order."""
+
+    @abstractmethod
+    def search(self, keyword: str) -> List[Movie]:
+        """Return movies whose title contains `keyword` (case-insensitive)."""
+
+    @abstractmethod
+    def get(self, title: str, year: int) -> Optional[Movie]:
+        """Return a single movie by title and year, or None."""
+
+    @abstractmethod
+    def set_ownership(self, title: str, year: int, own_status: str) -> bool:
+        """Persist a new 'Own' value. Returns False if the movie doesn't exist."""
+
+    @abstractmethod
+    def bulk_upsert(self, movies: Iterable[Movie]) -> int:
+        """Insert or update movies by (title, year) in one write. Returns the count."""
+
+    @abstractmethod
+    def change_token(self) -> Any:
+        """A cheap value that changes whenever storage may have been modified."""
+
+    def digest(self) -> str:
+        """
+        A content digest, only consulted when `change_token` moved. Backends
+        whose change token is already exact can keep this default.
+        """
+        return str(self.change_token())
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def close(self) -> None:
+        pass
+
+
+class OdsStorage(MovieStorage):
+    """
+    The original LibreOffice spreadsheet.
+
+    Columns the bot doesn't know about are kept, rows are matched on
+    normalized (title, year) when writing back.
+    """
+
+    name = "ods"
+
+    def __init__(self, path: str, sheet: str = "Movie List"):
+        super().__init__(path)
+        self.sheet = sheet
+        self._lock = threading.Lock()
+
+    def _read(self) -> pd.DataFrame:
+        pd = _pandas()
+        if not self.exists():
+            return pd.DataFrame(columns=ODS_COLUMNS)
+        df = pd.read_excel(self.path, sheet_name=self.sheet, engine="odf")
+        return df.reset_index(drop=True)
+
+    def _write(self, df: pd.DataFrame) -> None:
+        # Write next to the real file and swap it in, so readers never see half a sheet
+        root, ext = os.path.splitext(self.path)
+        tmp_path = f"{root}.tmp{ext}"
+        df.to_excel(tmp_path, engine="odf", index=False, sheet_name=self.sheet)  # type: ignore
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _rows(df: pd.DataFrame) -> List[Movie]:
+        pd = _pandas()
+        years = pd.to_numeric(df["Year"], errors="coerce").fillna(0).astype(int)
+        blank = pd.Series([None] * len(df))
+        tmdb_ids = pd.to_numeric(
+            df.get(ODS_METADATA_COLUMNS["tmdb_id"], blank), errors="coerce"
+        )
+        runtimes = pd.to_numeric(
+            df.get(ODS_METADATA_COLUMNS["runtime"], blank), errors="coerce"
+        )
+        movies = []
+        for row in zip(
+            df["Title"],
+            years,
+            df["Own"],
+            df.get("Movie Era", blank),
+            df.get("Description", blank),
+            tmdb_ids,
+            df.get(ODS_METADATA_COLUMNS["poster_path"], blank),
+            runtimes,
+            df.get(ODS_METADATA_COLUMNS["aliases"], blank),
+            df.get(ODS_METADATA_COLUMNS["studio"], blank),
+        ):
+            title, year, own, era, description, tmdb_id, poster, runtime = row[:8]
+            aliases, studio = row[8:]
+            movies.append(
+                Movie(
+                    title=str(title).strip(),
+                    year=int(year),
+                    own=str(own).strip() if pd.notna(own) else "",
+                    era=str(era).strip() if pd.notna(era) else "",
+                    description=str(description) if pd.notna(description) else "",
+                    tmdb_id=int(tmdb_id) if pd.notna(tmdb_id) else None,
+                    poster_path=str(poster) if pd.notna(poster) else "",
+                    runtime=int(runtime) if pd.notna(runtime) else 0,
+                    aliases=str(aliases).strip() if pd.notna(aliases) else "",
+                    studio=str(studio).strip() if pd.notna(studio) else "",
+                )
+            )
+        return movies
+
+    def load_all(self) -> List[Movie]:
+        with self._lock:
+            return self._rows(self._read())
+
+    def search(self, keyword: str) -> List[Movie]:
+        needle = keyword.strip().lower()
+        return [m for m in self.load_all() if needle in m.title.lower()]
+
+    def get(self, title: str, year: int) -> Optional[Movie]:
+        key = (normalize_title(title), int(year))
+        return next((m for m in self.load_all() if m.key == key), None)
+
+    def set_ownership(self, title: str, year: int, own_status: str) -> bool:
+        movie = self.get(title, year)
+        if movie is None:
+            return False
+        movie.own = own_status
+        self.bulk_upsert([movie])
+        return True
+
+    def bulk_upsert(self, movies: Iterable[Movie]) -> int:
+        movies = list(movies)
+        with self._lock:
+            df = self._read()
+            for column in ODS_COLUMNS:
+                if column not in df.columns:
+                    df[column] = ""
+                elif column != "Year":
+                    # An all-blank column (e.g. a guild's Era) is read back as floats
+                    df[column] = df[column].astype(object)
+
+            # Metadata columns only appear once something has been enriched
+            metadata = {
+                field: column
+                for field, column in ODS_METADATA_COLUMNS.items()
+                if column in df.columns or any(m.tmdb_id for m in movies)
+            }
+            for column in metadata.values():
+                df[column] = df[column].astype(object) if column in df else None
+
+            positions = {m.key: pos for pos, m in enumerate(self._rows(df))}
+            new_rows = []
+            count = 0
+            for movie in movies:
+                values = {
+                    "Own": movie.own,
+                    "Title": movie.title,
+                    "Year": movie.year,
+                    "Movie Era": movie.era,
+                    "Description": movie.description,
+                }
+                for field, column in metadata.items():
+                    values[column] = getattr(movie, field) or None
+                pos = positions.get(movie.key)
+                if pos is None:
+                    new_rows.append(values)
+                else:
+                    for column, value in values.items():
+                        df.at[pos, column] = value
+                count += 1
+
+            if new_rows:
+                pd = _pandas()
+                df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+            self._write(df)
+            return count
+
+    def change_token(self) -> Any:
+        if not self.exists():
+            return None
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def digest(self) -> str:
+        if not self.exists():
+            return ""
+        file_hash = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+
+class SqliteStorage(MovieStorage):
+    """
+    SQLite movie table, indexed on normalized title and on year.
+    """
+
+    name = "sqlite"
+    write_through = True
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS movies (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                title_norm TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                own TEXT NOT NULL DEFAULT 'No',
+                era TEXT NOT NULL DEFAULT '',
+                description TEXT NOT NULL DEFAULT '',
+                tmdb_id INTEGER,
+                poster_path TEXT NOT NULL DEFAULT '',
+                runtime INTEGER NOT NULL DEFAULT 0,
+                aliases TEXT NOT NULL DEFAULT '',
+                studio TEXT NOT NULL DEFAULT '',
+                UNIQUE (title_norm, year)
+            );
+            CREATE INDEX IF NOT EXISTS movies_year ON movies(year);
+            """)
+        self._migrate()
+        self._db.commit()
+
+    def _migrate(self) -> None:
+        # Databases created before the TMDB metadata columns existed
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(movies)")}
+        for column, definition in (
+            ("tmdb_id", "INTEGER"),
+            ("poster_path", "TEXT NOT NULL DEFAULT ''"),
+            ("runtime", "INTEGER NOT NULL DEFAULT 0"),
+            ("aliases", "TEXT NOT NULL DEFAULT ''"),
+            ("studio", "TEXT NOT NULL DEFAULT ''"),
+        ):
+            if column not in existing:
+                self._db.execute(f"ALTER TABLE movies ADD COLUMN {column} {definition}")
+
+    _COLUMNS = (
+        "title, year, own, era, description, "
+        "tmdb_id, poster_path, runtime, aliases, studio"
+    )
+
+    @staticmethod
+    def _movie(row: tuple) -> Movie:
+        return Movie(*row)
+
+    def load_all(self) -> List[Movie]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM movies ORDER BY id"
+            ).fetchall()
+        return [self._movie(r) for r in rows]
+
+    def search(self, keyword: str) -> List[Movie]:
+        needle = normalize_title(keyword)
+        escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM movies "
+                "WHERE title_norm LIKE ? ESCAPE '\\' ORDER BY id",
+                (f"%{escaped}%",),
+            ).fetchall()
+        return [self._movie(r) for r in rows]
+
+    def get(self, title: str, year: int) -> Optional[Movie]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM movies WHERE title_norm = ? AND year = ?",
+                (normalize_title(title), int(year)),
+            ).fetchone()
+        return None if row is None else self._movie(row)
+
+    def set_ownership(self, title: str, year: int, own_status: str) -> bool:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE movies SET own = ? WHERE title_norm = ? AND year = ?",
+                (own_status, normalize_title(title), int(year)),
+            )
+            self._db.commit()
+        return cursor.rowcount > 0
+
+    def bulk_upsert(self, movies: Iterable[Movie]) -> int:
+        rows = [
+            (
+                m.title,
+                normalize_title(m.title),
+                m.year,
+                m.own,
+                m.era,
+                m.description,
+                m.tmdb_id,
+                m.poster_path,
+                m.runtime,
+                m.aliases,
+                m.studio,
+            )
+            for m in movies
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                """
+                INSERT INTO movies (
+                    title, title_norm, year, own, era, description,
+                    tmdb_id, poster_path, runtime, aliases, studio
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (title_norm, year) DO UPDATE SET
+                    title = excluded.title,
+                    own = excluded.own,
+                    era = excluded.era,
+                    description = excluded.description,
+                    tmdb_id = COALESCE(excluded.tmdb_id, tmdb_id),
+                    poster_path = COALESCE(NULLIF(excluded.poster_path, ''), poster_path),
+                    runtime = COALESCE(NULLIF(excluded.runtime, 0), runtime),
+                    aliases = COALESCE(NULLIF(excluded.aliases, ''), aliases),
+                    studio = COALESCE(NULLIF(excluded.studio, ''), studio)
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def change_token(self) -> Any:
+        # data_version only moves when another connection commits, our own
+        # writes are already reflected in the catalog
+        with self._lock:
+            return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_storage(kind: str, path: str, sheet: str = "Movie List") -> MovieStorage:
+    """
+    Create a storage backend by name ("ods" or "sqlite").
+    """
+    kind = kind.lower()
+    if kind == "ods":
+        return OdsStorage(path, sheet)
+    if kind == "sqlite":
+        return SqliteStorage(path)
+    raise ValueError(f"Unknown movie storage backend: {kind!r}")
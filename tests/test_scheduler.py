@@ -0,0 +1,55 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from utils.tmdb.scheduler import RequestScheduler
+
+
+async def _response() -> str:
+    return "ok"
+
+
+async def _connection_error() -> str:
+    raise aiohttp.ClientConnectionError()
+
+
+async def _closed_while_waiting(prepare, request) -> None:
+    scheduler = RequestScheduler()
+    scheduler.start()
+    prepare(scheduler)
+    submitted = asyncio.create_task(scheduler.submit(request))
+    # Let a worker take the job off the queue
+    await asyncio.sleep(0.1)
+    await scheduler.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        await asyncio.wait_for(submitted, timeout=1)
+
+
+def _paused(scheduler: RequestScheduler) -> None:
+    # As after a 429 with Retry-After: workers wait for a token
+    scheduler.bucket.pause(5)
+
+
+def _retrying(scheduler: RequestScheduler) -> None:
+    scheduler.base_delay = scheduler.max_delay = 5
+
+
+def test_close_fails_job_waiting_for_token():
+    asyncio.run(_closed_while_waiting(_paused, _response))
+
+
+def test_close_fails_job_waiting_to_retry():
+    asyncio.run(_closed_while_waiting(_retrying, _connection_error))
+
+
+def test_submit_returns_result():
+    async def main() -> str:
+        scheduler = RequestScheduler()
+        scheduler.start()
+        try:
+            return await scheduler.submit(_response)
+        finally:
+            await scheduler.close()
+
+    assert asyncio.run(main()) == "ok"
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import discord
+from discord import app_commands
+
+from .logs import get_logger
+
+log = get_logger(__name__)
+
+# Where the fingerprints of the last successful sync per scope are kept
+SYNC_STATE_FILE = "./src/command_sync.json"
+
+
+def _digest(data: Any) -> str:
+    blob = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def scope_name(guild: Optional[discord.abc.Snowflake]) -> str:
+    return "global" if guild is None else f"guild:{guild.id}"
+
+
+def command_hashes(
+    tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None
+) -> Dict[str, str]:
+    """
+    Hash of the payload `tree.sync()` would upload for each top-level command
+    in one scope, keyed by "<type>:<name>".
+    """
+    hashes = {}
+    for command in tree.get_commands(guild=guild):
+        payload = command.to_dict(tree)
+        hashes[f"{payload.get('type', 1)}:{payload['name']}"] = _digest(payload)
+    return hashes
+
+
+def fingerprint(hashes: Dict[str, str]) -> str:
+    return _digest(sorted(hashes.items()))
+
+
+@dataclass
+class ScopeDiff:
+    scope: str
+    guild: Optional[discord.abc.Snowflake]
+    fingerprint: str
+    hashes: Dict[str, str]
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    # Never synced by this bot, or the state file is missing
+    unknown: bool = False
+
+    @property
+    def needs_sync(self) -> bool:
+        return self.unknown or bool(self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        if not self.needs_sync:
+            return f"{self.scope}: up to date"
+        if self.unknown:
+            return (
+                f"{self.scope}: no previous sync recorded, {len(self.hashes)} commands"
+            )
+        parts = [
+            f"{label} {', '.join(_display(n) for n in names)}"
+            for label, names in (
+                ("+", self.added),
+                ("-", self.removed),
+                ("~", self.changed),
+            )
+            if names
+        ]
+        return f"{self.scope}: " + "; ".join(parts)
+
+
+def _display(key: str) -> str:
+    # "1:movie" -> "/movie", context menus keep their type prefix
+    kind, _, name = key.partition(":")
+    return f"/{name}" if kind == "1" else key
+
+
+class CommandSyncer:
+    """
+    Syncs the command tree only where it changed since the last sync.
+
+    For each scope (global, and each guild) the upload payload of every
+    command is hashed; the per-command hashes from the last successful sync
+    are kept in `path`. Scopes whose fingerprint matches are skipped, so a
+    restart that didn't change any command makes no sync requests at all.
+    Discord only allows a couple hundred command creates per day, and a full
+    `tree.sync()` counts against that for every scope it touches.
+    """
+
+    def __init__(self, tree: app_commands.CommandTree, path: str = SYNC_STATE_FILE):
+        self.tree = tree
+        self.path = path
+
+    # ---- State ---- #
+    def load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning("command_sync.bad_state", path=self.path, error=repr(e))
+            return {}
+
+    def _save_state(self, state: Dict[str, Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def record(self, diff: ScopeDiff) -> None:
+        """Remember `diff`'s commands as what Discord now has for its scope."""
+        state = self.load_state()
+        state[diff.scope] = {
+            "fingerprint": diff.fingerprint,
+            "commands": diff.hashes,
+            "synced_at": time.time(),
+        }
+        self._save_state(state)
+
+    # ---- Planning ---- #
+    def diff(self, guild: Optional[discord.abc.Snowflake] = None) -> ScopeDiff:
+        scope = scope_name(guild)
+        hashes = command_hashes(self.tree, guild)
+        result = ScopeDiff(scope, guild, fingerprint(hashes), hashes)
+
+        previous = self.load_state().get(scope)
+        if previous is None:
+            result.unknown = True
+            return result
+        if previous.get("fingerprint") == result.fingerprint:
+            return result
+
+        before: Dict[str, str] = previous.get("commands", {})
+        result.added = sorted(set(hashes) - set(before))
+        result.removed = sorted(set(before) - set(hashes))
+        result.changed = sorted(
+            k for k in hashes if k in before and hashes[k] != before[k]
+        )
+        return result
+
+    def plan(
+        self, guilds: Iterable[Optional[discord.abc.Snowflake]]
+    ) -> List[ScopeDiff]:
+        return [self.diff(guild) for guild in guilds]
+
+    # ---- Syncing ---- #
+    async def sync(
+        self,
+        guilds: Iterable[Optional[discord.abc.Snowflake]],
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> List[ScopeDiff]:
+        """
+        Sync every scope in `guilds` (None is the global scope) that changed.
+
+        Parameters:
+            guilds (Iterable[Optional[Snowflake]]): Scopes to check.
+            force (bool, default=False): Sync even if nothing changed.
+            dry_run (bool, default=False): Only work out what would be synced.
+
+        Returns:
+            List[ScopeDiff]: The scopes that were (or would be) synced.
+
+        Raises:
+            discord.HTTPException: If a sync request fails; scopes synced
+                before it are still recorded.
+        """
+        synced = []
+        for diff in self.plan(guilds):
+            if not (force or diff.needs_sync):
+                log.info("command_sync.skipped", scope=diff.scope)
+                continue
+            synced.append(diff)
+            if dry_run:
+                continue
+
+            commands = await self.tree.sync(guild=diff.guild)
+            self.record(diff)
+            log.info(
+                "command_sync.synced",
+                scope=diff.scope,
+                commands=[c.name for c in commands],
+                change=diff.describe(),
+            )
+        return synced
@@ -0,0 +1,52 @@
+import os
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+
+Scope = Optional[discord.abc.Snowflake]
+
+
+def _guild_ids(value: Optional[str]) -> List[int]:
+    return [int(part) for part in (value or "").replace(" ", "").split(",") if part]
+
+
+def home_guild() -> Scope:
+    """
+    The owner's guild (GUILD_ID), where owner-only commands are registered.
+    None registers them globally, they are still checked for the owner.
+    """
+    ids = _guild_ids(os.getenv("GUILD_ID"))
+    return discord.Object(id=ids[0]) if ids else None
+
+
+def public_scopes() -> List[Scope]:
+    """
+    Where the commands everyone can use are registered: each guild listed in
+    COMMAND_GUILDS (guild commands update instantly, handy for testing), or
+    globally so every guild the bot joins gets them.
+    """
+    ids = _guild_ids(os.getenv("COMMAND_GUILDS"))
+    return [discord.Object(id=i) for i in ids] or [None]
+
+
+def command_scopes() -> List[Scope]:
+    """Every scope the tree registers commands in, global first."""
+    scopes: List[Scope] = [None]
+    seen = set()
+    for scope in [*public_scopes(), home_guild()]:
+        if scope is not None and scope.id not in seen:
+            seen.add(scope.id)
+            scopes.append(scope)
+    return scopes
+
+
+def add_command(
+    tree: app_commands.CommandTree,
+    command: app_commands.Group,
+    scopes: List[Scope],
+) -> None:
+    """Add `command` to each scope that doesn't have it yet."""
+    for guild in scopes:
+        if not tree.get_command(command.name, guild=guild):
+            tree.add_command(command, guild=guild)
@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import discord
+from discord import app_commands
+
+from .logs import get_logger
+from .metrics import metrics
+
+log = get_logger(__name__)
+
+# Discord invalidates an interaction that isn't acknowledged within 3 seconds
+INTERACTION_DEADLINE = 3.0
+
+# Keyword arguments for `edit_original_response`, e.g. {"embed": embed}
+Reply = Dict[str, Any]
+
+
+# Keep references to running background work so it isn't garbage collected
+_background: Set["asyncio.Task[None]"] = set()
+
+
+async def run_deferred(
+    interaction: discord.Interaction,
+    work: Callable[[], Awaitable[Reply]],
+    *,
+    name: str,
+    timeout: float = 15.0,
+    ephemeral: bool = False,
+    on_sent: Optional[Callable[[discord.Message], None]] = None,
+) -> "asyncio.Task[None]":
+    """
+    Acknowledge an interaction right away and finish it in the background.
+
+    The interaction is deferred (Discord shows "thinking..."), then `work` runs
+    as a tracked task with a timeout. Its reply replaces the deferred response;
+    timeouts and errors are reported to the user instead of leaving it hanging.
+
+    Parameters:
+        interaction (discord.Interaction): The interaction to respond to.
+        work (Callable[[], Awaitable[Reply]]): Produces the reply kwargs.
+        name (str): Metric name, usually the command's qualified name.
+        timeout (float, default=15.0): Seconds before giving up on `work`.
+        ephemeral (bool, default=False): Only show the response to the user.
+        on_sent (Optional[Callable[[discord.Message], None]]): Called with the
+            delivered message, e.g. to remember attachment URLs.
+
+    Returns:
+        asyncio.Task[None]: The background task delivering the reply.
+    """
+    age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+    if age > INTERACTION_DEADLINE:
+        metrics.incr("deadline_miss", name)
+
+    await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+
+    async def deliver() -> None:
+        started = time.perf_counter()
+        failed = True
+        try:
+            reply = await asyncio.wait_for(work(), timeout=timeout)
+        except asyncio.TimeoutError:
+            metrics.incr("deferred_timeout", name)
+            reply = {"content": "⏱️ That took too long, please try again."}
+        except asyncio.CancelledError:
+            # e.g. shutdown; replace "thinking..." before letting it through
+            metrics.incr("deferred_cancelled", name)
+            metrics.observe("deferred", name, time.perf_counter() - started, True)
+            with contextlib.suppress(discord.HTTPException):
+                await interaction.edit_original_response(
+                    content="⚠️ This was interrupted, please try again."
+                )
+            raise
+        except Exception:
+            log.exception("deferred.failed", command=name)
+            reply = {"content": "⚠️ Something went wrong, please try again."}
+        else:
+            failed = False
+
+        metrics.observe("deferred", name, time.perf_counter() - started, failed)
+        try:
+            message = await interaction.edit_original_response(**reply)
+        except discord.HTTPException as e:
+            log.warning("deferred.undeliverable", command=name, error=repr(e))
+            return
+        if on_sent is not None and not failed:
+            on_sent(message)
+
+    task = asyncio.create_task(deliver(), name=f"deferred:{name}")
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return task
+
+
+async def cancel_background() -> None:
+    """
+    Cancel deferred work that is still running, e.g. when a cog unloads.
+    """
+    tasks = list(_background)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class MeteredCommandTree(app_commands.CommandTree):
+    """
+    Command tree that times every slash command and autocomplete callback.
+
+    Deferred commands only count up to the defer here, their background work
+    is recorded separately under "deferred" by `run_deferred`.
+    """
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        started = time.perf_counter()
+        error = False
+        try:
+            await super()._call(interaction)
+        except Exception:
+            error = True
+            raise
+        finally:
+            kind = (
+                "autocomplete"
+                if interaction.type is discord.InteractionType.autocomplete
+                else "command"
+            )
+            command = interaction.command
+            name = command.qualified_name if command else "unknown"
+            metrics.observe(
+                kind,
+                name,
+                time.perf_counter() - started,
+                error=error or interaction.command_failed,
+            )
@@ -0,0 +1,157 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
+
+# Keyword arguments the logging module itself understands
+_LOGGING_KWARGS = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class EventLogger(logging.LoggerAdapter):
+    """
+    Logger taking an event name plus fields, e.g.
+    `log.info("catalog.loaded", movies=120, version=3)`.
+
+    The fields travel with the record and are rendered by the formatter.
+    """
+
+    def process(
+        self, msg: Any, kwargs: MutableMapping[str, Any]
+    ) -> Tuple[Any, MutableMapping[str, Any]]:
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _LOGGING_KWARGS}
+        extra = dict(kwargs.get("extra") or {})
+        extra["fields"] = {**extra.get("fields", {}), **fields}
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+
+def get_logger(name: str) -> EventLogger:
+    return EventLogger(logging.getLogger(name), {})
+
+
+def _fields(record: logging.LogRecord) -> Dict[str, Any]:
+    return getattr(record, "fields", None) or {}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """`2025-01-01 12:00:00 INFO catalog catalog.loaded movies=120`"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(f"{k}={v!r}" for k, v in _fields(record).items())
+        if not fields:
+            return line
+        # Fields stay on the event's line, a traceback follows on the next ones
+        head, sep, rest = line.partition("\n")
+        return f"{head} {fields}{sep}{rest}"
+
+
+class EventQueueHandler(logging.handlers.QueueHandler):
+    """
+    `QueueHandler` that keeps the message an event name.
+
+    The stock `prepare` folds the traceback into the message and drops
+    `exc_info`. Here the traceback is rendered into `exc_text` instead (the
+    exception itself can't cross threads safely), which both formatters
+    output separately.
+    """
+
+    _formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    path: Optional[str] = None,
+) -> None:
+    """
+    Route all logging through a queue so callers never wait on stdout or disk.
+
+    Records are put on an unbounded queue by the root logger's `QueueHandler`;
+    a `QueueListener` thread formats and writes them. Safe to call more than
+    once, later calls are ignored until `stop_logging()`.
+
+    Parameters:
+        level (Optional[str]): Log level, defaults to $LOG_LEVEL or INFO.
+        fmt (Optional[str]): "text" or "json", defaults to $LOG_FORMAT or text.
+        path (Optional[str]): Also write to this file, defaults to $LOG_FILE.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+    path = path or os.getenv("LOG_FILE")
+    formatter = JsonFormatter() if fmt == "json" else TextFormatter()
+
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if path:
+        handlers.append(
+            logging.handlers.RotatingFileHandler(
+                path, maxBytes=5_000_000, backupCount=3, encoding="utf-8"
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [EventQueueHandler(log_queue)]
+    root.setLevel(level)
+    # discord.py is chatty at DEBUG, keep it at INFO unless asked otherwise
+    logging.getLogger("discord").setLevel(max(root.level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
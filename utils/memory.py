@@ -0,0 +1,168 @@
+import gc
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import discord
+
+
+# ---- Profiles ---- #
+@dataclass(frozen=True)
+class MemoryProfile:
+    """
+    How much the bot caches. "default" keeps discord.py's defaults; "low"
+    doesn't cache members (no command needs them), keeps the last 100
+    messages instead of 1000, doesn't request every guild's member list at
+    startup and keeps fewer TMDB responses in memory.
+    """
+
+    name: str
+    # None keeps discord.py's default: every member the intents allow
+    member_cache_flags: Optional[discord.MemberCacheFlags]
+    max_messages: Optional[int]
+    chunk_guilds_at_startup: bool
+    tmdb_memory_entries: int
+
+    def bot_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "max_messages": self.max_messages,
+            "chunk_guilds_at_startup": self.chunk_guilds_at_startup,
+        }
+        if self.member_cache_flags is not None:
+            options["member_cache_flags"] = self.member_cache_flags
+        return options
+
+
+PROFILES = {
+    "default": MemoryProfile("default", None, 1000, True, 512),
+    "low": MemoryProfile("low", discord.MemberCacheFlags.none(), 100, False, 128),
+}
+
+
+def memory_profile(name: Optional[str] = None) -> MemoryProfile:
+    """
+    The profile called `name`, or the one set with MEMORY_PROFILE.
+
+    Raises:
+        ValueError: If there is no such profile.
+    """
+    name = (name or os.getenv("MEMORY_PROFILE") or "default").lower()
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown MEMORY_PROFILE {name!r}, expected one of {sorted(PROFILES)}."
+        ) from None
+
+
+# ---- Process ---- #
+def peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size; the peak where the current one isn't available."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return peak_rss_bytes()
+
+
+def megabytes(size: Optional[int]) -> Optional[float]:
+    return None if size is None else round(size / 1024 / 1024, 1)
+
+
+# ---- tracemalloc ---- #
+def start_tracing(frames: Optional[int] = None) -> bool:
+    """
+    Start tracemalloc, with `frames` or TRACEMALLOC frames per traceback.
+    Only allocations made after this are seen, and tracing costs memory and
+    CPU itself, so it is off unless asked for.
+
+    Returns:
+        bool: Whether tracing is on now.
+    """
+    if frames is None:
+        frames = int(os.getenv("TRACEMALLOC") or 0)
+        if not frames:
+            return tracemalloc.is_tracing()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return True
+
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+
+
+def _short(filename: str) -> str:
+    # site-packages/discord/state.py -> discord/state.py
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+def top_allocations(
+    limit: int = 10, group_by: str = "lineno"
+) -> List[Tuple[str, int, int]]:
+    """
+    The largest live allocations since tracing started, grouped by line
+    (or "filename"), as (location, bytes, blocks).
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        )
+    )
+    rows = []
+    for stat in snapshot.statistics(group_by)[:limit]:
+        frame = stat.traceback[0]
+        location = _short(frame.filename)
+        if group_by == "lineno":
+            location += f":{frame.lineno}"
+        rows.append((location, stat.size, stat.count))
+    return rows
+
+
+# ---- Object counts ---- #
+def live_objects(*types: Type[Any]) -> Dict[str, int]:
+    """
+    Live instances of `types` (and their subclasses) by class name. Walks
+    every tracked object, so it takes a moment on a big heap.
+    """
+    counts: Counter[str] = Counter()
+    for obj in gc.get_objects():
+        if isinstance(obj, types):
+            counts[type(obj).__name__] += 1
+    return dict(counts)
+
+
+def discord_cache_sizes(client: discord.Client) -> Dict[str, int]:
+    guilds = client.guilds
+    return {
+        "guilds": len(guilds),
+        "members": sum(len(g.members) for g in guilds),
+        "users": len(client.users),
+        "channels": sum(len(g.channels) for g in guilds),
+        "roles": sum(len(g.roles) for g in guilds),
+        "emojis": len(client.emojis),
+        "stickers": len(client.stickers),
+        "messages": len(client.cached_messages),
+        "persistent_views": len(client.persistent_views),
+    }
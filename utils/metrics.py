@@ -0,0 +1,128 @@
+import contextlib
+import math
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Histogram bucket bounds in seconds: 0.5ms growing by 25% per bucket to ~2 min
+_BUCKET_START = 0.0005
+_BUCKET_GROWTH = 1.25
+_BUCKET_COUNT = 56
+BUCKETS: List[float] = [_BUCKET_START * _BUCKET_GROWTH**i for i in range(_BUCKET_COUNT)]
+
+
+class Histogram:
+    """
+    Latency histogram with fixed exponential buckets.
+
+    Memory and `observe()` cost don't grow with the number of samples;
+    percentiles are accurate to one bucket (about 25%).
+    """
+
+    __slots__ = ("counts", "count", "errors", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (_BUCKET_COUNT + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        if seconds <= _BUCKET_START:
+            bucket = 0
+        else:
+            bucket = min(
+                _BUCKET_COUNT,
+                math.ceil(math.log(seconds / _BUCKET_START, _BUCKET_GROWTH)),
+            )
+        self.counts[bucket] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the `q` quantile (0 < q <= 1).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[min(bucket, _BUCKET_COUNT - 1)], self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    """
+    Counters and latency histograms keyed by (kind, name), e.g.
+    ("command", "movie info"), ("tmdb", "/movie/{id}") or ("storage", "refresh").
+
+    Only touched from the event loop, so no locking.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+
+    def histogram(self, kind: str, name: str) -> Histogram:
+        key = (kind, name)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = Histogram()
+        return hist
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        self.histogram(kind, name).observe(seconds, error)
+
+    def incr(self, kind: str, name: str, n: int = 1) -> None:
+        self.counters[(kind, name)] = self.counters.get((kind, name), 0) + n
+
+    @contextlib.contextmanager
+    def timer(self, kind: str, name: str) -> Iterator[None]:
+        """
+        Time the block, counting it as an error if it raises. Works around
+        `await` too, it measures wall time.
+        """
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - started, error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Histogram summaries grouped by kind, plus a "counters" group.
+        """
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (kind, name), hist in sorted(self.histograms.items()):
+            result.setdefault(kind, {})[name] = hist.summary()
+        for (kind, name), value in sorted(self.counters.items()):
+            result.setdefault("counters", {})[f"{kind}:{name}"] = {"value": value}
+        return result
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+
+
+metrics = MetricsRegistry()
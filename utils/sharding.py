@@ -0,0 +1,74 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from discord.ext import commands
+
+
+def parse_shard_ids(value: str) -> List[int]:
+    """
+    "0-3,8" -> [0, 1, 2, 3, 8].
+
+    Raises:
+        ValueError: If a part isn't a number or a range.
+    """
+    ids: List[int] = []
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        ids.extend(range(int(start), int(end) + 1) if sep else [int(start)])
+    return sorted(set(ids))
+
+
+def shard_options() -> Dict[str, Any]:
+    """
+    AutoShardedBot arguments from SHARD_COUNT and SHARD_IDS.
+
+    With neither set Discord recommends the shard count and this process runs
+    every shard. To split the bot across processes, give each the same
+    SHARD_COUNT and its own SHARD_IDS range, e.g. "0-3" and "4-7".
+
+    Raises:
+        ValueError: If SHARD_IDS is set without SHARD_COUNT, or names shards
+            outside of it.
+    """
+    count = os.getenv("SHARD_COUNT")
+    ids = os.getenv("SHARD_IDS")
+    if not count:
+        if ids:
+            raise ValueError("SHARD_IDS needs SHARD_COUNT to be set too.")
+        return {}
+
+    options: Dict[str, Any] = {"shard_count": int(count)}
+    if ids:
+        shard_ids = parse_shard_ids(ids)
+        if not shard_ids or shard_ids[-1] >= int(count):
+            raise ValueError(f"SHARD_IDS {ids!r} don't fit SHARD_COUNT {count}.")
+        options["shard_ids"] = shard_ids
+    return options
+
+
+def runs_shard_zero(bot: commands.AutoShardedBot) -> bool:
+    """
+    Whether this process runs shard 0. Commands are registered for the whole
+    application, so only this process syncs them.
+    """
+    shard_ids: Optional[List[int]] = bot.shard_ids
+    return shard_ids is None or 0 in shard_ids
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """The shard Discord sends `guild_id`'s events to."""
+    return (guild_id >> 22) % shard_count
+
+
+def runs_guild(bot: commands.AutoShardedBot, guild_id: Optional[int]) -> bool:
+    """
+    Whether this process runs the shard serving `guild_id`; DMs (None) are
+    served by shard 0.
+    """
+    shard_ids: Optional[List[int]] = bot.shard_ids
+    if shard_ids is None:
+        return True
+    shard = 0 if guild_id is None else shard_for(guild_id, bot.shard_count or 1)
+    return shard in shard_ids
@@ -0,0 +1,127 @@
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set
+
+from discord.ext import commands
+
+from .logs import get_logger
+from .memory import megabytes, rss_bytes
+
+log = get_logger(__name__)
+
+
+class StartupReport:
+    """
+    How long each startup phase took, and when milestones such as "ready" were
+    reached, measured from `started` (the top of main.py).
+
+    `modules` is the number of imported modules at each point, which shows
+    where heavy imports happen, and `rss` the process's resident memory.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+        self.milestones: Dict[str, float] = {}
+        self.modules: Dict[str, int] = {}
+        self.rss: Dict[str, Optional[int]] = {}
+        self.cogs: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+
+    def mark(self, name: str) -> None:
+        """Record that milestone `name` was reached now."""
+        if name not in self.milestones:
+            self.milestones[name] = time.perf_counter() - self.started
+            self.modules[name] = len(sys.modules)
+            self.rss[name] = rss_bytes()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+            self.modules[name] = len(sys.modules)
+            self.rss[name] = rss_bytes()
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(values: Dict[str, float]) -> Dict[str, float]:
+            return {k: round(v * 1000, 1) for k, v in values.items()}
+
+        return {
+            "milestones_ms": ms(self.milestones),
+            "phases_ms": ms(self.phases),
+            "cogs_ms": ms(self.cogs),
+            "modules": dict(self.modules),
+            "rss_mb": {k: megabytes(v) for k, v in self.rss.items()},
+            "failed": dict(self.failed),
+        }
+
+
+def discover_cogs(path: str = "./cogs", package: str = "cogs") -> List[str]:
+    return sorted(
+        f"{package}.{filename[:-3]}"
+        for filename in os.listdir(path)
+        if filename.endswith(".py") and not filename.startswith("_")
+    )
+
+
+def load_order(
+    names: Iterable[str], depends_on: Mapping[str, Sequence[str]]
+) -> List[List[str]]:
+    """
+    Group extensions into waves: every extension's dependencies are in an
+    earlier wave. Dependencies that aren't being loaded are ignored.
+
+    Raises:
+        ValueError: If the dependencies form a cycle.
+    """
+    remaining: Set[str] = set(names)
+    deps = {
+        name: {d for d in depends_on.get(name, ()) if d in remaining and d != name}
+        for name in remaining
+    }
+    done: Set[str] = set()
+    waves: List[List[str]] = []
+    while remaining:
+        ready = sorted(name for name in remaining if deps[name] <= done)
+        if not ready:
+            raise ValueError(f"Cog dependency cycle between {sorted(remaining)}")
+        waves.append(ready)
+        done.update(ready)
+        remaining.difference_update(ready)
+    return waves
+
+
+async def load_cogs(
+    bot: commands.Bot,
+    names: Iterable[str],
+    report: StartupReport,
+    depends_on: Optional[Mapping[str, Sequence[str]]] = None,
+) -> None:
+    """
+    Load extensions concurrently, wave by wave in dependency order.
+
+    Imports still run one at a time (they hold the GIL), but each cog's async
+    setup, e.g. warming a cache or opening a connection, overlaps with the
+    others. A cog that fails is logged and recorded in the report; the cogs
+    depending on it are still loaded.
+    """
+
+    async def load(name: str) -> None:
+        started = time.perf_counter()
+        try:
+            await bot.load_extension(name)
+        except Exception as e:
+            report.failed[name] = repr(e)
+            log.exception("cog.failed", cog=name)
+        else:
+            report.cogs[name] = time.perf_counter() - started
+            log.info("cog.loaded", cog=name, ms=round(report.cogs[name] * 1000, 1))
+
+    for wave in load_order(names, depends_on or {}):
+        await asyncio.gather(*(load(name) for name in wave))
@@ -0,0 +1,274 @@
+import aiohttp
+import asyncio
+import re
+from typing import Dict, Any, Optional, List
+from .cache import TMDbCache, search_key
+from .models import MovieResults
+from .scheduler import RequestScheduler
+from .tmdb_api import TMDbBase
+from utils.metrics import metrics
+
+# Metric name for a request path: /movie/1678/credits -> /movie/{id}/credits
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class AsyncTMDbAPI(TMDbBase):
+    """
+    Non-blocking TMDB client built on a single long-lived `aiohttp.ClientSession`.
+
+    The session keeps connections alive between requests and caches DNS lookups,
+    so repeated lookups reuse the same TCP/TLS connection to TMDB. Call `start()`
+    from inside the running event loop (the bot does this in `setup_hook`) and
+    `close()` on shutdown.
+
+    When a `TMDbCache` is given, search results, details and credits are served
+    from it and identical in-flight lookups share one request. Requests that do
+    go out pass through `scheduler` (rate limiting, priorities, retries).
+    """
+
+    def __init__(
+        self,
+        total_timeout: float = 10.0,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 5.0,
+        pool_limit: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60.0,
+        cache: Optional[TMDbCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
+        super().__init__()
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler()
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout,
+            connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+        self.pool_limit = pool_limit
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        """
+        Open the pooled HTTP session. Safe to call more than once.
+        """
+        if self._session is not None and not self._session.closed:
+            return
+
+        self.scheduler.start()
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=self.timeout,
+            connector=connector,
+            raise_for_status=False,
+        )
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session and release pooled connections.
+        """
+        await self.scheduler.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncTMDbAPI":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError(
+                "AsyncTMDbAPI session is not started, call start() first."
+            )
+        return self._session
+
+    async def _get(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Perform a GET request against the TMDB API through the scheduler and
+        return the decoded JSON.
+
+        Raises:
+            aiohttp.ClientResponseError: If TMDB still returns an error status
+                after retrying.
+        """
+        return await self.scheduler.submit(lambda: self._request(path, params))
+
+    async def _request(
+        self, path: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        endpoint = _ID_SEGMENT.sub("/{id}", path)
+        with metrics.timer("tmdb", endpoint):
+            async with self.session.get(f"{self.base_url}{path}", params=params) as r:
+                if r.status >= 400:
+                    metrics.incr("tmdb_status", str(r.status))
+                r.raise_for_status()
+                return await r.json()
+
+    async def _get_cached(
+        self,
+        kind: str,
+        key: Any,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        `_get` through the response cache, when one is configured.
+        """
+        if self.cache is None:
+            return await self._get(path, params=params)
+        return await self.cache.get_or_fetch(
+            kind, key, lambda: self._get(path, params=params)
+        )
+
+    async def search_movie(
+        self, title: str, year: Optional[int] = None, include_adult: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search TMDB for a movie by title and optional release year.
+
+        Parameters:
+            title (str): The title of the movie.
+            year (Optional[int]): The year of the movie (optional).
+            include_adult (bool, default=True): include adult (R/NC-17) content.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionary representing matching movies.
+        """
+        params: Dict[str, Any] = {
+            "query": title,
+            "include_adult": "true" if include_adult else "false",
+        }
+
+        if year:
+            params["primary_release_year"] = year
+
+        key = search_key(title, year) + ("" if include_adult else "|safe")
+        data = await self._get_cached("search", key, "/search/movie", params=params)
+        return data.get("results", [])
+
+    async def get_movie_by_title(
+        self, title: str, year: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a single movie from TMDB title, using exact or fuzzy matching.
+
+        Parameters:
+            title (str): The exact title of the move to search.
+            year (Optional[int]): Optional release year.
+
+        Returns:
+            Optional[Dict[str, Any]]: The best matching search result, or None.
+        """
+        results = await self.search_movie(title, year)
+        return self.pick_best_match(title, results)
+
+    async def get_movie_details(
+        self, movie_id: int, append: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns TMDB movie information through ID.
+
+        Parameters:
+            movie_id (int): TMDB movie ID.
+            append (Optional[List[str]]): Sub-resources to fetch in the same request
+                through `append_to_response` (e.g. ["credits"]).
+
+        Raises:
+            aiohttp.ClientResponseError: If the HTTP request to TMDB fails.
+        """
+        if append:
+            params = {"append_to_response": ",".join(append)}
+            return await self._get(f"/movie/{movie_id}", params=params)
+        return await self._get_cached("details", movie_id, f"/movie/{movie_id}")
+
+    async def get_movie_credits(self, movie_id: int) -> Dict[str, Any]:
+        """
+        Fetch the credits (cast and crew) for a movie from TMDB.
+
+        Parameters:
+            movie_id (int): The TMDB ID of the movie.
+
+        Raises:
+            aiohttp.ClientResponseError: If the HTTP request to TMDB fails.
+        """
+        return await self._get_cached("credits", movie_id, f"/movie/{movie_id}/credits")
+
+    async def get_movie_with_credits(
+        self, movie_id: int
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Fetch details and credits for a movie in a single request.
+
+        Parameters:
+            movie_id (int): The TMDB ID of the movie.
+
+        Returns:
+            tuple[Dict[str, Any], Dict[str, Any]]: (details, credits)
+        """
+        if self.cache is None:
+            raw = await self.get_movie_details(movie_id, append=["credits"])
+            return self.split_appended_credits(raw)
+
+        cache = self.cache
+
+        async def fetch_both() -> Dict[str, Any]:
+            raw = await self.get_movie_details(movie_id, append=["credits"])
+            details, credits = self.split_appended_credits(raw)
+            await cache.set_async("credits", movie_id, credits)
+            return details
+
+        details = await cache.get_or_fetch("details", movie_id, fetch_both)
+        credits = await self.get_movie_credits(movie_id)
+        return details, credits
+
+    async def get_movie_embed_data(
+        self,
+        title: str = "",
+        year: Optional[int] = None,
+        movie_id: Optional[int] = None,
+        single_request: bool = True,
+    ) -> MovieResults:
+        """
+        Look up everything the /movie info embed needs.
+
+        Parameters:
+            title (str): Title to search for, ignored when `movie_id` is given.
+            year (Optional[int]): Optional release year for the search.
+            movie_id (Optional[int]): Known TMDB id, skips the search request.
+            single_request (bool, default=True): Fetch details and credits together
+                with `append_to_response`. When False, both are fetched concurrently.
+
+        Returns:
+            MovieResults: Parsed details, poster and credits, or success=False.
+        """
+        if movie_id is None:
+            search = await self.get_movie_by_title(title, year)
+            movie_id = search.get("id") if search else None
+
+        if movie_id is None:
+            return MovieResults(success=False, error="Results not Found.")
+
+        if single_request:
+            r_details, r_credits = await self.get_movie_with_credits(movie_id)
+        else:
+            r_details, r_credits = await asyncio.gather(
+                self.get_movie_details(movie_id),
+                self.get_movie_credits(movie_id),
+            )
+
+        return self.build_movie_results(r_details, r_credits)
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Default time-to-live per kind of cached response, in seconds
+DEFAULT_TTLS: Dict[str, int] = {
+    "search": 24 * 60 * 60,
+    "details": 7 * 24 * 60 * 60,
+    "credits": 30 * 24 * 60 * 60,
+}
+
+
+def search_key(query: str, year: Optional[int] = None) -> str:
+    """
+    Normalized cache key for a TMDB search: (query, year).
+    """
+    return f"{' '.join(query.lower().split())}|{year or ''}"
+
+
+class _FetchAbandoned(Exception):
+    """The request a coalesced caller was waiting on was cancelled."""
+
+
+class TMDbCache:
+    """
+    Two level cache for TMDB JSON responses.
+
+    Entries live in an in-memory LRU in front of an on-disk SQLite store so
+    they survive restarts. Every kind ("search", "details", "credits") has its
+    own TTL, the memory level is bounded by `max_memory_entries` and the disk
+    level by `max_disk_entries` (least recently used rows are evicted first).
+
+    Concurrent `get_or_fetch` calls for the same key share one upstream request.
+    From async code the disk level is only touched in worker threads; `get` and
+    `set` do their disk I/O inline and are meant for the sync client.
+    """
+
+    def __init__(
+        self,
+        path: str = "./src/tmdb_cache.sqlite3",
+        ttls: Optional[Dict[str, int]] = None,
+        max_memory_entries: int = 512,
+        max_disk_entries: int = 20_000,
+    ):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        # Memory level and counters; held only briefly, the event loop takes it
+        self._lock = threading.Lock()
+        # SQLite connection, held for the duration of a disk read or write
+        self._db_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._closed = False
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tmdb_cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS tmdb_cache_accessed ON tmdb_cache(accessed_at)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS tmdb_cache_expires ON tmdb_cache(expires_at)"
+        )
+        self._db.commit()
+        # Kept up to date on every write instead of counting rows each time
+        self._disk_entries: int = self._db.execute(
+            "SELECT COUNT(*) FROM tmdb_cache"
+        ).fetchone()[0]
+
+    # ---- Stats ---- #
+    def _count(self, kind: str, name: str) -> None:
+        counters = self._stats.setdefault(
+            kind, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0}
+        )
+        counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters per kind plus the current size of each level.
+        """
+        with self._lock:
+            return {
+                "kinds": {kind: dict(c) for kind, c in self._stats.items()},
+                "memory_entries": len(self._memory),
+                "disk_entries": self._disk_entries,
+                "inflight": len(self._inflight),
+            }
+
+    # ---- Get / Set ---- #
+    def get(self, kind: str, key: Hashable) -> Optional[Any]:
+        """
+        Return a cached value, or None if it is missing or expired.
+        """
+        mem_key = (kind, str(key))
+        found, value = self._get_memory(mem_key)
+        if found:
+            return value
+        return self._get_disk(mem_key)
+
+    def set(self, kind: str, key: Hashable, value: Any) -> None:
+        """
+        Store a value in both levels using the TTL for its kind.
+        """
+        mem_key, expires_at = self._remember_new(kind, key, value)
+        self._store(mem_key, value, expires_at)
+
+    async def set_async(self, kind: str, key: Hashable, value: Any) -> None:
+        """
+        `set` with the disk write in a worker thread.
+        """
+        mem_key, expires_at = self._remember_new(kind, key, value)
+        await asyncio.to_thread(self._store, mem_key, value, expires_at)
+
+    def _get_memory(self, mem_key: Tuple[str, str]) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._memory.get(mem_key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._memory[mem_key]
+                return False, None
+            self._memory.move_to_end(mem_key)
+            self._count(mem_key[0], "memory_hits")
+            return True, value
+
+    def _get_disk(self, mem_key: Tuple[str, str]) -> Optional[Any]:
+        now = time.time()
+        with self._db_lock:
+            if self._closed:
+                return None
+            row = self._db.execute(
+                "SELECT value, expires_at FROM tmdb_cache WHERE kind = ? AND key = ?",
+                mem_key,
+            ).fetchone()
+            if row is not None and row[1] > now:
+                self._db.execute(
+                    "UPDATE tmdb_cache SET accessed_at = ? WHERE kind = ? AND key = ?",
+                    (now, *mem_key),
+                )
+                self._db.commit()
+
+        with self._lock:
+            if row is None or row[1] <= now:
+                self._count(mem_key[0], "misses")
+                return None
+            value = json.loads(row[0])
+            self._remember(mem_key, row[1], value)
+            self._count(mem_key[0], "disk_hits")
+            return value
+
+    def _remember_new(
+        self, kind: str, key: Hashable, value: Any
+    ) -> Tuple[Tuple[str, str], float]:
+        mem_key = (kind, str(key))
+        expires_at = time.time() + self.ttls.get(kind, DEFAULT_TTLS["details"])
+        with self._lock:
+            self._remember(mem_key, expires_at, value)
+        return mem_key, expires_at
+
+    def _remember(self, mem_key: Tuple[str, str], expires_at: float, value: Any):
+        self._memory[mem_key] = (expires_at, value)
+        self._memory.move_to_end(mem_key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, mem_key: Tuple[str, str], value: Any, expires_at: float) -> None:
+        now = time.time()
+        data = json.dumps(value)
+        with self._db_lock:
+            if self._closed:
+                return
+            exists = self._db.execute(
+                "SELECT 1 FROM tmdb_cache WHERE kind = ? AND key = ?", mem_key
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO tmdb_cache VALUES (?, ?, ?, ?, ?)",
+                (*mem_key, data, expires_at, now),
+            )
+            if exists is None:
+                self._disk_entries += 1
+            self._evict_disk(now)
+            self._db.commit()
+
+    def _evict_disk(self, now: float) -> None:
+        expired = self._db.execute(
+            "DELETE FROM tmdb_cache WHERE expires_at <= ?", (now,)
+        ).rowcount
+        self._disk_entries -= expired
+        overflow = self._disk_entries - self.max_disk_entries
+        if overflow > 0:
+            evicted = self._db.execute(
+                """
+                DELETE FROM tmdb_cache WHERE rowid IN (
+                    SELECT rowid FROM tmdb_cache ORDER BY accessed_at LIMIT ?
+                )
+                """,
+                (overflow,),
+            ).rowcount
+            self._disk_entries -= evicted
+
+    # ---- Coalescing ---- #
+    async def get_or_fetch(
+        self, kind: str, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for (kind, key), calling `fetch` on a miss.
+
+        If the same key is already being fetched, wait for that request instead
+        of starting another one. Should that request be cancelled (its caller
+        timed out, say), the waiters fetch again themselves.
+        """
+        mem_key = (kind, str(key))
+        found, cached = self._get_memory(mem_key)
+        if found:
+            return cached
+        cached = await asyncio.to_thread(self._get_disk, mem_key)
+        if cached is not None:
+            return cached
+
+        while True:
+            pending = self._inflight.get(mem_key)
+            if pending is None:
+                break
+            self._count(kind, "coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except _FetchAbandoned:
+                continue
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[mem_key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            # Only this caller was cancelled, not the ones waiting on it
+            future.set_exception(_FetchAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting, don't warn about an unretrieved error
+            future.exception()
+            raise
+        else:
+            mem_key, expires_at = self._remember_new(kind, key, value)
+            future.set_result(value)
+        finally:
+            self._inflight.pop(mem_key, None)
+
+        await asyncio.to_thread(self._store, mem_key, value, expires_at)
+        return value
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._closed = True
+            self._db.close()
@@ -2,34 +2,36 @@ from dataclasses import dataclass, field
 from typing import List
 
 
-@dataclass
+# Slotted records (no per-instance __dict__), a credits payload can hold
+# hundreds of them. Not frozen: frozen dataclass __init__ is several times slower.
+@dataclass(slots=True)
 class CrewMember:
     name: str = ""
     job: str = ""
     department: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class CastMember:
     name: str = ""
     character: str = ""
     order: int = 999
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductionCompany:
     name: str = ""
     logo_path: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedCredits:
     directors: List[CrewMember] = field(default_factory=list)
     writers: List[CrewMember] = field(default_factory=list)
     actors: List[CastMember] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class MovieDetails:
     title: str = ""
     release_date: str = ""
@@ -45,7 +47,7 @@ class MovieDetails:
     origin_countries: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class MovieResults:
     success: bool
     details: MovieDetails = field(default_factory=MovieDetails)
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+import discord
+
+from utils.logs import get_logger
+
+log = get_logger(__name__)
+
+# TMDB serves every poster pre-resized, so each variant is just another size
+POSTER_SIZES = {"thumb": "w185", "full": "w500"}
+
+# Reuse an uploaded attachment URL only if it is valid for at least this long
+_URL_MARGIN = 3600
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]")
+# New upload URLs are written to the index at most this often (seconds)
+_SAVE_DELAY = 5.0
+
+
+@dataclass
+class PosterImage:
+    """
+    What to put in an embed: `url` for `set_image`/`set_thumbnail`, plus the
+    file to attach when the url is an "attachment://" reference.
+    """
+
+    url: str
+    file: Optional[discord.File] = None
+
+
+class PosterCache:
+    """
+    Posters downloaded once from TMDB's image CDN and kept on disk.
+
+    Files are evicted least recently used first once the directory grows past
+    `max_bytes`. Embeds attach the local file; after the first upload the
+    Discord CDN URL of the attachment is remembered and reused until it
+    expires, so later embeds need neither an upload nor a TMDB fetch.
+    Concurrent requests for the same poster share one download. Disk access
+    runs in worker threads, and the upload index is saved a few seconds
+    after it changes rather than on every message.
+    """
+
+    def __init__(
+        self,
+        directory: str = "./src/posters",
+        max_bytes: int = 100 * 1024 * 1024,
+        image_base: str = "https://image.tmdb.org/t/p",
+        timeout: float = 10.0,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.image_base = image_base
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.index_path = os.path.join(directory, "uploads.json")
+
+        # filename -> size in bytes, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        # filename -> (Discord CDN url, expiry unix time)
+        self._uploads: Dict[str, Tuple[str, float]] = {}
+        self._inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        self._prefetching: Set["asyncio.Task[Optional[str]]"] = set()
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._saving: Set["asyncio.Task[None]"] = set()
+        self._save_lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.stats_counters = {"hits": 0, "downloads": 0, "failed": 0, "reused": 0}
+
+    # ---- Lifecycle ---- #
+    async def start(self) -> None:
+        entries, uploads = await asyncio.to_thread(self._scan)
+        # Oldest access first, so eviction order survives restarts
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._bytes += size
+
+        # An uploaded copy outlives the local file, until its URL expires
+        now = time.time()
+        self._uploads = {
+            k: (url, expires)
+            for k, (url, expires) in uploads.items()
+            if expires - now >= _URL_MARGIN
+        }
+
+        if self._session is None or self._session.closed:
+            # Own session: the TMDB API session sends the bearer token
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+
+    def _scan(self) -> Tuple[List[Tuple[float, str, int]], Dict[str, Any]]:
+        """The files on disk as (mtime, name, size), and the saved upload index."""
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if name == os.path.basename(self.index_path) or name.endswith(".tmp"):
+                continue
+            st = os.stat(os.path.join(self.directory, name))
+            entries.append((st.st_mtime, name, st.st_size))
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                uploads = json.load(f)
+        except (OSError, ValueError):
+            uploads = {}
+        return entries, uploads
+
+    async def close(self) -> None:
+        for task in list(self._prefetching):
+            task.cancel()
+        await asyncio.gather(*self._prefetching, return_exceptions=True)
+        # Write out uploads still waiting for the debounced save
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+            await self._save_uploads()
+        await asyncio.gather(*self._saving, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ---- Files ---- #
+    @staticmethod
+    def filename(poster_path: str, variant: str) -> str:
+        return f"{variant}_{_SAFE_NAME.sub('_', poster_path.lstrip('/'))}"
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Bump the file's mtime for eviction order; False if it is gone."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _remove(paths: List[str]) -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def _evict(self) -> None:
+        evicted = []
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._bytes -= size
+            evicted.append(os.path.join(self.directory, name))
+        if evicted:
+            await asyncio.to_thread(self._remove, evicted)
+
+    async def cached_file(self, poster_path: str, variant: str) -> Optional[str]:
+        name = self.filename(poster_path, variant)
+        if name not in self._files:
+            return None
+        self._files.move_to_end(name)
+        path = os.path.join(self.directory, name)
+        if not await asyncio.to_thread(self._touch, path):
+            # Removed outside the cache; another call may have dropped it already
+            size = self._files.pop(name, None)
+            if size is not None:
+                self._bytes -= size
+            return None
+        return path
+
+    async def fetch(self, poster_path: str, variant: str = "full") -> Optional[str]:
+        """
+        Local path of the poster, downloading it on first use.
+
+        Returns:
+            Optional[str]: None if the download failed.
+        """
+        path = await self.cached_file(poster_path, variant)
+        if path is not None:
+            self.stats_counters["hits"] += 1
+            return path
+
+        name = self.filename(poster_path, variant)
+        inflight = self._inflight.get(name)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: "asyncio.Future[Optional[str]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[name] = future
+        try:
+            path = await self._download(poster_path, variant, name)
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_result(None)
+            self.stats_counters["failed"] += 1
+            log.warning("poster.download_failed", poster=poster_path, error=repr(e))
+            return None
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            del self._inflight[name]
+
+    def prefetch(self, poster_path: str, variant: str = "full") -> None:
+        """Download the poster in the background for the next embed."""
+        task = asyncio.create_task(self.fetch(poster_path, variant))
+        self._prefetching.add(task)
+        task.add_done_callback(self._prefetching.discard)
+
+    async def _download(self, poster_path: str, variant: str, name: str) -> str:
+        if self._session is None:
+            raise RuntimeError("PosterCache is not started, call start() first.")
+
+        url = f"{self.image_base}/{POSTER_SIZES[variant]}{poster_path}"
+        async with self._session.get(url) as r:
+            r.raise_for_status()
+            data = await r.read()
+
+        path = os.path.join(self.directory, name)
+        await asyncio.to_thread(self._write, path, data)
+        self._files[name] = len(data)
+        self._bytes += len(data)
+        await self._evict()
+        self.stats_counters["downloads"] += 1
+        return path
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # ---- Discord CDN reuse ---- #
+    @staticmethod
+    def _expiry(url: str) -> float:
+        # Signed attachment URLs carry their expiry as hex unix time in "ex"
+        ex = parse_qs(urlparse(url).query).get("ex")
+        try:
+            return float(int(ex[0], 16)) if ex else float("inf")
+        except ValueError:
+            return 0.0
+
+    def cdn_url(self, poster_path: str, variant: str) -> Optional[str]:
+        name = self.filename(poster_path, variant)
+        upload = self._uploads.get(name)
+        if upload is None:
+            return None
+        url, expires = upload
+        if expires - time.time() < _URL_MARGIN:
+            del self._uploads[name]
+            return None
+        return url
+
+    def remember_upload(self, message: discord.Message) -> None:
+        """
+        Keep the CDN URLs of poster attachments on a message we just sent.
+        """
+        changed = False
+        for attachment in message.attachments:
+            if attachment.filename in self._files:
+                self._uploads[attachment.filename] = (
+                    attachment.url,
+                    self._expiry(attachment.url),
+                )
+                changed = True
+        if changed and self._save_handle is None:
+            self._save_handle = asyncio.get_running_loop().call_later(
+                _SAVE_DELAY, self._start_save
+            )
+
+    def _start_save(self) -> None:
+        self._save_handle = None
+        task = asyncio.create_task(self._save_uploads())
+        self._saving.add(task)
+        task.add_done_callback(self._saving.discard)
+
+    async def _save_uploads(self) -> None:
+        # One write at a time, each with the uploads as they are when it starts
+        async with self._save_lock:
+            uploads = {k: list(v) for k, v in self._uploads.items()}
+            try:
+                await asyncio.to_thread(self._write_index, self.index_path, uploads)
+            except OSError as e:
+                log.warning("posters.index_save_failed", error=repr(e))
+
+    @staticmethod
+    def _write_index(path: str, uploads: Dict[str, Any]) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(uploads, f)
+        os.replace(tmp_path, path)
+
+    # ---- Embeds ---- #
+    async def image(
+        self, poster_path: str, variant: str = "full", download: bool = True
+    ) -> Optional[PosterImage]:
+        """
+        The poster for an embed: a still valid Discord CDN URL, or the local
+        file as an attachment.
+
+        Parameters:
+            poster_path (str): TMDB poster path, e.g. "/abc.jpg".
+            variant (str, default="full"): "full" or "thumb".
+            download (bool, default=True): Fetch the poster if it isn't on disk
+                yet; when False a missing poster returns None right away.
+        """
+        if not poster_path:
+            return None
+
+        url = self.cdn_url(poster_path, variant)
+        if url is not None:
+            self.stats_counters["reused"] += 1
+            return PosterImage(url)
+
+        if download:
+            path = await self.fetch(poster_path, variant)
+        else:
+            path = await self.cached_file(poster_path, variant)
+        if path is None:
+            return None
+
+        name = os.path.basename(path)
+        return PosterImage(f"attachment://{name}", discord.File(path, filename=name))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats_counters,
+            "files": len(self._files),
+            "bytes": self._bytes,
+            "uploads": len(self._uploads),
+        }
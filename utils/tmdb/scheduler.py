@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import aiohttp
+
+# Statuses worth retrying: rate limited or a temporary server side problem
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# Requests default to interactive, background jobs wrap their work in
+# `background_priority()` and everything they await inherits it
+current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "tmdb_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def background_priority() -> Iterator[None]:
+    token = current_priority.set(Priority.BACKGROUND)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average with bursts up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, e.g. after a Retry-After."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    request: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: "asyncio.Future[Any]" = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+
+
+@dataclass
+class _WaitStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+class RequestScheduler:
+    """
+    Queue in front of all TMDB requests.
+
+    Requests are started in priority order (interactive before background)
+    by a fixed number of workers, each start costs a token from a bucket sized
+    for TMDB's rate limit. 429 and 5xx responses and connection errors are
+    retried with jittered exponential backoff; a Retry-After header pauses the
+    whole bucket for that long. The retry goes back into the queue, so it
+    doesn't hold a worker while it waits.
+    """
+
+    def __init__(
+        self,
+        rate: float = 40.0,
+        burst: int = 20,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._queue: Optional[asyncio.PriorityQueue[_Job]] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        # Retries waiting out their backoff, by job seq
+        self._retrying: Dict[int, "tuple[_Job, asyncio.TimerHandle]"] = {}
+        self._seq = itertools.count()
+        self._depth: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._waits: Dict[Priority, _WaitStats] = {p: _WaitStats() for p in Priority}
+        self.retries = 0
+        self.rate_limited = 0
+
+    # ---- Lifecycle ---- #
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"tmdb-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Fail anything still queued or waiting to retry instead of leaving
+        # callers hanging
+        for job, handle in self._retrying.values():
+            handle.cancel()
+            self._fail(job)
+        self._retrying.clear()
+        while self._queue is not None and not self._queue.empty():
+            self._fail(self._queue.get_nowait())
+        self._queue = None
+
+    @staticmethod
+    def _fail(job: _Job) -> None:
+        if not job.future.done():
+            job.future.set_exception(RuntimeError("RequestScheduler was closed."))
+
+    # ---- Submitting ---- #
+    async def submit(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        priority: Optional[Priority] = None,
+    ) -> Any:
+        """
+        Queue `request` and wait for its result.
+
+        Parameters:
+            request (Callable[[], Awaitable[Any]]): Performs one HTTP request,
+                called again for every retry.
+            priority (Optional[Priority]): Defaults to the current context's
+                priority (see `background_priority`).
+        """
+        if self._queue is None:
+            raise RuntimeError("RequestScheduler is not started, call start() first.")
+
+        priority = current_priority.get() if priority is None else priority
+        job = _Job(
+            priority=priority,
+            seq=next(self._seq),
+            request=request,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        self._enqueue(job)
+        return await job.future
+
+    def _enqueue(self, job: _Job) -> None:
+        if self._queue is None:
+            self._fail(job)
+            return
+        if job.future.done():
+            return
+        self._depth[Priority(job.priority)] += 1
+        self._queue.put_nowait(job)
+
+    def _retry(self, job: _Job) -> None:
+        self._retrying.pop(job.seq, None)
+        self._enqueue(job)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: anywhere between 0 and the exponential cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None if `error` isn't retryable.
+        """
+        if isinstance(error, aiohttp.ClientResponseError):
+            if error.status not in RETRY_STATUSES:
+                return None
+            retry_after = (error.headers or {}).get("Retry-After")
+            if error.status == 429:
+                self.rate_limited += 1
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = self._backoff(attempt)
+                self.bucket.pause(delay)
+                return delay
+            return self._backoff(attempt)
+
+        if isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+            return self._backoff(attempt)
+        return None
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            priority = Priority(job.priority)
+            self._depth[priority] -= 1
+            if job.future.done():
+                continue
+
+            try:
+                # Off the queue now: close() can only fail the job through here
+                await self.bucket.acquire()
+                if job.attempt == 0:
+                    waited = time.monotonic() - job.enqueued_at
+                    wait = self._waits[priority]
+                    wait.count += 1
+                    wait.total += waited
+                    wait.max = max(wait.max, waited)
+                result = await job.request()
+            except asyncio.CancelledError:
+                # The worker is being closed, not the caller
+                self._fail(job)
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, job.attempt)
+                if delay is None or job.attempt >= self.max_retries:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                    continue
+                self.retries += 1
+                job.attempt += 1
+                self._retrying[job.seq] = (
+                    job,
+                    loop.call_later(delay, self._retry, job),
+                )
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+
+    # ---- Stats ---- #
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and wait times per priority, plus retry counters.
+        """
+        return {
+            "queue_depth": {p.name.lower(): n for p, n in self._depth.items()},
+            "wait_seconds": {
+                p.name.lower(): {
+                    "count": w.count,
+                    "avg": w.total / w.count if w.count else 0.0,
+                    "max": w.max,
+                }
+                for p, w in self._waits.items()
+            },
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
@@ -1,7 +1,9 @@
-import requests
+import heapq
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from typing import Dict, Any, Optional, List
+from .cache import TMDbCache, search_key
 from .models import (
     CrewMember,
     CastMember,
@@ -11,9 +13,19 @@ from .models import (
     MovieResults,
 )
 from rapidfuzz import process, fuzz
+from utils.logs import get_logger
 
+log = get_logger(__name__)
+
+
+class TMDbBase:
+    """
+    Shared configuration and parsing helpers for the TMDB clients.
+
+    Subclasses implement the transport (blocking `requests` or `aiohttp`),
+    everything that only reshapes TMDB JSON lives here.
+    """
 
-class TMDbAPI:
     def __init__(self):
         load_dotenv()
         self.token = os.getenv("TMDB_ACCESS")
@@ -25,102 +37,47 @@ class TMDbAPI:
         self.base_url = "https://api.themoviedb.org/3"
         self.base_img = "https://image.tmdb.org/t/p/w500"
 
-    def search_movie(
-        self, title: str, year: Optional[int] = None, include_adult: bool = True
-    ) -> List[Dict[str, Any]]:
-        """
-        Search TMDB for a movie by title and optional release year.
-
-        Parameters:
-            title (str): The title of the movie.
-            year (Optional[int]): The year of the movie (optional).
-            include_adult (bool, default=True): include adult (R/NC-17) content.
-
-        Returns:
-            List[Dict[str, Any]]: A list of dictionary representing matching movies:
-                - The dictionary contains details like 'id', 'title', 'release_date', etc.
-        """
-        url = f"{self.base_url}/search/movie"
-        params = {
-            "query": title,
-            "include_adult": include_adult,
-        }
-
-        if year:
-            params["primary_release_year"] = year
-
-        r = requests.get(url, params=params, headers=self.headers)
-        return r.json().get("results", [])
-
-    def get_movie_by_title(
-        self, title: str, year: Optional[int] = None
+    def pick_best_match(
+        self, title: str, results: List[Dict[str, Any]]
     ) -> Optional[Dict[str, Any]]:
         """
-        Retrieve a single movie from TMDB title, using exact or fuzzy matching.
+        Select the result that best matches a title, using exact or fuzzy matching.
 
-        This function wraps `search_movie`:
         - First attempts to find an exact title match (case-insensitive).
         - If not exact match is found, performs fuzzy matching to select the closest title.
         - Returns None if no sufficiently close match exists.
 
         Parameters:
-            title (str): The exact title of the move to search.
-            year (Optional[int]): Optional release year.
+            title (str): The title that was searched for.
+            results (List[Dict[str, Any]]): Results from the TMDB search endpoint.
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary representing the movie details if found,
-            or None if no match passes the fuzzy matching threshold.
+            Optional[Dict[str, Any]]: The best matching movie, or None if no match
+            passes the fuzzy matching threshold.
         """
-        results = self.search_movie(title, year)
         for movie in results:
             if movie.get("title", "").lower() == title.lower():
                 return movie
 
         titles = [m.get("title", "") for m in results]
         if not titles:
-            print("[Fuzzy] No titles found in TMDB results.")
+            log.debug("fuzzy.no_results", title=title)
 
         match_results = process.extractOne(title, titles, scorer=fuzz.token_sort_ratio)
 
         if match_results is None:
-            print("[Fuzzy] No fuzzy match found.")
+            log.debug("fuzzy.no_match", title=title)
             return None
 
         best_match, score, idx = match_results
 
-        print(f"[Fuzzy] Closest match: '{best_match}' ({score:.1f}%)")
+        log.debug("fuzzy.closest", title=title, match=best_match, score=round(score, 1))
         if score >= 70:
             return results[idx]
 
-        print("[Fuzzy] Match socre too low.")
+        log.debug("fuzzy.score_too_low", title=title, score=round(score, 1))
         return None
 
-    def get_movie_details(self, movie_id: int) -> Dict[str, Any]:
-        """
-        Returns TMDB movie information through ID.
-
-        Parameters:
-            movie_id (int): TMDB movie ID.
-
-        Returns:
-            Dict[str, Any]: A dictionary containing:
-                - 'genres': movie genres associated with the film.
-                - 'origin_country': movie's origin.
-                - 'overview': short description of the movie.
-                - 'budget': movies budget.
-                - 'revenue': amount movie made.
-                - 'runtime': movie length in minutes.
-                - 'title': the movie title.
-                - 'vote_average': TMDB rating.
-
-        Raises:
-            requests.HTTPError: If the HTTP request to TMDB fails.
-        """
-        url = f"{self.base_url}/movie/{movie_id}"
-        r = requests.get(url, headers=self.headers)
-        r.raise_for_status()
-        return r.json()
-
     def parse_movie_details(self, raw: Dict[str, Any]) -> MovieDetails:
         """
         Nomarlizes raw TMDB movie details into a MovieDetails dataclass.
@@ -169,26 +126,6 @@ class TMDbAPI:
             return f"{self.base_img}{img_address}"
         return None
 
-    def get_movie_credits(self, movie_id: int) -> Dict[str, Any]:
-        """
-        Fetch the credits (cast and crew) for a movie from TMDB.
-
-        Parameters:
-            movie_id (int): The TMDB ID of the movie.
-
-        Returns:
-            Dict[str, Any]: a dictionary containing:
-                - 'cast': List of cast member dictionaires.
-                - 'crew': List of crew member dictionaires.
-
-        Raises:
-            requests.HTTPError: If the HTTP request to TMDB fails.
-        """
-        url = f"{self.base_url}/movie/{movie_id}/credits"
-        r = requests.get(url, headers=self.headers)
-        r.raise_for_status()
-        return r.json()
-
     def _to_cast_member(self, raw: Dict[str, Any]) -> CastMember:
         """
         Convert a raw TMDB dict into a CastMember dataclass
@@ -224,38 +161,16 @@ class TMDbAPI:
             job=raw.get("job", ""),
         )
 
-    def _filter_crew_by_job(
-        self,
-        clean_crew: List[CrewMember],
-        department_substring: str,
-        job_substring: Optional[str] = None,
-    ) -> List[CrewMember]:
-        """
-        Filters a list of CrewMember dataclasses by department and optionally by job.
-
-        Parameters:
-            clean_crew (List[CrewMember]): List of normalized crew members.
-            department_substring (str): Substring to match in the department field.
-            job_substring (Optional[str]): Substring to match in the job field. If None, ignores job.
-
-        Returns:
-            List[CrewMember]: Crew member matching the specified filters.
-        """
-        results: List[CrewMember] = [
-            member
-            for member in clean_crew
-            if department_substring in member.department.lower()
-            and (job_substring is None or job_substring in member.job.lower())
-        ]
-
-        return results
-
     def parse_movie_credits(
         self, credits: Dict[str, Any], top_n: int = 5
     ) -> ParsedCredits:
         """
         Parses TMDB movie credits and returns structured dataclasses.
 
+        Only the entries that end up in the result are turned into dataclasses:
+        the top N actors are picked from the raw cast with a heap, and directors
+        and writers are picked out of the raw crew in a single pass.
+
         Parameters:
             credits (Dict[str, Any]): Raw TMDB credits JSON from /movie/{movie_id}/credits
             top_n (int, optional): the number of top actors to return based on order (default=5)
@@ -269,26 +184,27 @@ class TMDbAPI:
         raw_cast: List[Dict[str, Any]] = credits.get("cast") or []
         raw_crew: List[Dict[str, Any]] = credits.get("crew") or []
 
-        clean_cast = [
-            self._to_cast_member(c)
-            for c in raw_cast
-            if isinstance(c, dict) and "name" in c
-        ]
-
-        clean_crew: List[CrewMember] = [
-            self._to_crew_member(m)
-            for m in raw_crew
-            if isinstance(m, dict) and "name" in m
-        ]
-
-        # Get Director(s)
-        directors = self._filter_crew_by_job(clean_crew, "directing", "director")
-
-        # Get Writer
-        writers = self._filter_crew_by_job(clean_crew, "writing")
-
         # Get Top x main actors
-        actors = sorted(clean_cast, key=lambda x: x.order)[:top_n]
+        top_cast = heapq.nsmallest(
+            top_n,
+            (c for c in raw_cast if isinstance(c, dict) and "name" in c),
+            key=lambda c: c.get("order", 999),
+        )
+        actors = [self._to_cast_member(c) for c in top_cast]
+
+        # Get Director(s) and Writer(s)
+        directors: List[CrewMember] = []
+        writers: List[CrewMember] = []
+        for m in raw_crew:
+            department = m.get("department") if isinstance(m, dict) else None
+            if not department or "name" not in m:
+                continue
+            department = department.lower()
+            if "directing" in department:
+                if "director" in (m.get("job") or "").lower():
+                    directors.append(self._to_crew_member(m))
+            elif "writing" in department:
+                writers.append(self._to_crew_member(m))
 
         return ParsedCredits(
             directors=directors,
@@ -296,29 +212,256 @@ class TMDbAPI:
             actors=actors,
         )
 
-    def get_movie_embed_data(
+    def split_appended_credits(
+        self, raw: Dict[str, Any]
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Split a `/movie/{id}?append_to_response=credits` payload into its parts.
+
+        Parameters:
+            raw (Dict[str, Any]): Raw JSON with credits appended.
+
+        Returns:
+            tuple[Dict[str, Any], Dict[str, Any]]: (details, credits)
+        """
+        details = dict(raw)
+        credits = details.pop("credits", None) or {}
+        return details, credits
+
+    def build_movie_results(
+        self, r_details: Dict[str, Any], r_credits: Dict[str, Any]
+    ) -> MovieResults:
+        """
+        Build the MovieResults used by the /movie info embed from raw TMDB JSON.
+        """
+        details = self.parse_movie_details(r_details)
+        movie_poster = self.get_movie_img(details.poster_path)
+        credits = self.parse_movie_credits(r_credits)
+
+        return MovieResults(
+            success=True,
+            details=details,
+            poster=movie_poster or "",
+            credits=credits,
+        )
+
+
+class TMDbAPI(TMDbBase):
+    """
+    Blocking TMDB client built on `requests`.
+
+    Responses are read from and written to `cache` when one is given.
+    """
+
+    def __init__(self, cache: Optional[TMDbCache] = None):
+        super().__init__()
+        self.cache = cache
+
+    def _http_get(self, url: str, params: Optional[Dict[str, Any]] = None):
+        # Imported on first use: the bot only uses the async client, and
+        # requests (with certifi, urllib3, ...) adds noticeably to startup
+        import requests
+
+        return requests.get(url, params=params, headers=self.headers)
+
+    def _get_cached(
+        self,
+        kind: str,
+        key: Any,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        GET a TMDB url, going through the response cache when one is configured.
+
+        Raises:
+            requests.HTTPError: If the HTTP request to TMDB fails.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(kind, key)
+            if cached is not None:
+                return cached
+
+        r = self._http_get(url, params)
+        r.raise_for_status()
+        data = r.json()
+
+        if self.cache is not None:
+            self.cache.set(kind, key, data)
+        return data
+
+    def search_movie(
+        self, title: str, year: Optional[int] = None, include_adult: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search TMDB for a movie by title and optional release year.
+
+        Parameters:
+            title (str): The title of the movie.
+            year (Optional[int]): The year of the movie (optional).
+            include_adult (bool, default=True): include adult (R/NC-17) content.
+
+        Returns:
+            List[Dict[str, Any]]: A list of dictionary representing matching movies:
+                - The dictionary contains details like 'id', 'title', 'release_date', etc.
+        """
+        url = f"{self.base_url}/search/movie"
+        params = {
+            "query": title,
+            "include_adult": include_adult,
+        }
+
+        if year:
+            params["primary_release_year"] = year
+
+        key = search_key(title, year) + ("" if include_adult else "|safe")
+        if self.cache is not None:
+            cached = self.cache.get("search", key)
+            if cached is not None:
+                return cached.get("results", [])
+
+        r = self._http_get(url, params)
+        data = r.json()
+        if self.cache is not None and r.ok:
+            self.cache.set("search", key, data)
+        return data.get("results", [])
+
+    def get_movie_by_title(
         self, title: str, year: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a single movie from TMDB title, using exact or fuzzy matching.
+
+        This function wraps `search_movie`:
+        - First attempts to find an exact title match (case-insensitive).
+        - If not exact match is found, performs fuzzy matching to select the closest title.
+        - Returns None if no sufficiently close match exists.
+
+        Parameters:
+            title (str): The exact title of the move to search.
+            year (Optional[int]): Optional release year.
+
+        Returns:
+            Optional[Dict[str, Any]]: A dictionary representing the movie details if found,
+            or None if no match passes the fuzzy matching threshold.
+        """
+        results = self.search_movie(title, year)
+        return self.pick_best_match(title, results)
+
+    def get_movie_details(
+        self, movie_id: int, append: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns TMDB movie information through ID.
+
+        Parameters:
+            movie_id (int): TMDB movie ID.
+            append (Optional[List[str]]): Sub-resources to fetch in the same request
+                through `append_to_response` (e.g. ["credits"]).
+
+        Returns:
+            Dict[str, Any]: A dictionary containing:
+                - 'genres': movie genres associated with the film.
+                - 'origin_country': movie's origin.
+                - 'overview': short description of the movie.
+                - 'budget': movies budget.
+                - 'revenue': amount movie made.
+                - 'runtime': movie length in minutes.
+                - 'title': the movie title.
+                - 'vote_average': TMDB rating.
+
+        Raises:
+            requests.HTTPError: If the HTTP request to TMDB fails.
+        """
+        url = f"{self.base_url}/movie/{movie_id}"
+        if not append:
+            return self._get_cached("details", movie_id, url)
+
+        params = {"append_to_response": ",".join(append)}
+        r = self._http_get(url, params)
+        r.raise_for_status()
+        return r.json()
+
+    def get_movie_credits(self, movie_id: int) -> Dict[str, Any]:
+        """
+        Fetch the credits (cast and crew) for a movie from TMDB.
+
+        Parameters:
+            movie_id (int): The TMDB ID of the movie.
+
+        Returns:
+            Dict[str, Any]: a dictionary containing:
+                - 'cast': List of cast member dictionaires.
+                - 'crew': List of crew member dictionaires.
+
+        Raises:
+            requests.HTTPError: If the HTTP request to TMDB fails.
+        """
+        url = f"{self.base_url}/movie/{movie_id}/credits"
+        return self._get_cached("credits", movie_id, url)
+
+    def get_movie_with_credits(
+        self, movie_id: int
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Fetch details and credits for a movie in a single request.
+
+        Parameters:
+            movie_id (int): The TMDB ID of the movie.
+
+        Returns:
+            tuple[Dict[str, Any], Dict[str, Any]]: (details, credits)
+        """
+        if self.cache is not None:
+            details = self.cache.get("details", movie_id)
+            credits = self.cache.get("credits", movie_id)
+            if details is not None and credits is not None:
+                return details, credits
+
+        raw = self.get_movie_details(movie_id, append=["credits"])
+        details, credits = self.split_appended_credits(raw)
+        if self.cache is not None:
+            self.cache.set("details", movie_id, details)
+            self.cache.set("credits", movie_id, credits)
+        return details, credits
+
+    def get_movie_embed_data(
+        self,
+        title: str = "",
+        year: Optional[int] = None,
+        movie_id: Optional[int] = None,
+        single_request: bool = True,
     ) -> MovieResults:
-        search = self.get_movie_by_title(title, year)
-
-        if search:
-            id = search.get("id")
-            if id is not None:
-                r_details = self.get_movie_details(id)
-                details = self.parse_movie_details(r_details)
-                movie_poster = self.get_movie_img(details.poster_path)
-
-                r_credits = self.get_movie_credits(id)
-                credits = self.parse_movie_credits(r_credits)
-
-                return MovieResults(
-                    success=True,
-                    details=details,
-                    poster=movie_poster or "",
-                    credits=credits,
-                )
+        """
+        Look up everything the /movie info embed needs.
 
-        return MovieResults(success=False, error="Results not Found.")
+        Parameters:
+            title (str): Title to search for, ignored when `movie_id` is given.
+            year (Optional[int]): Optional release year for the search.
+            movie_id (Optional[int]): Known TMDB id, skips the search request.
+            single_request (bool, default=True): Fetch details and credits together
+                with `append_to_response`. When False, both are fetched concurrently.
+
+        Returns:
+            MovieResults: Parsed details, poster and credits, or success=False.
+        """
+        if movie_id is None:
+            search = self.get_movie_by_title(title, year)
+            movie_id = search.get("id") if search else None
+
+        if movie_id is None:
+            return MovieResults(success=False, error="Results not Found.")
+
+        if single_request:
+            r_details, r_credits = self.get_movie_with_credits(movie_id)
+        else:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                details_future = pool.submit(self.get_movie_details, movie_id)
+                credits_future = pool.submit(self.get_movie_credits, movie_id)
+                r_details = details_future.result()
+                r_credits = credits_future.result()
+
+        return self.build_movie_results(r_details, r_credits)
 
 
 # ----- Example Usage ----- #
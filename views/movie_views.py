@@ -1,81 +1,348 @@
 import discord
+import hashlib
+import re
+import weakref
+from collections import OrderedDict
 from discord.ui import View
-from movie_manager.movie_manager import update_movie, mark_not_owned
+from movie_manager.async_catalog import AsyncMovieCatalog
+from movie_manager.bulk import BulkOwnershipReport, OwnershipChange
+from movie_manager.catalog import MovieCatalog
+from movie_manager.models import Movie, normalize_title
+from movie_manager.movie_manager import catalog, guild_catalogs
+from movie_manager.search import search_text
+from utils.interactions import Reply, run_deferred
+from typing import Dict, List, Optional, Tuple
+
+# ---- Ownership buttons ---- #
+# Discord caps custom ids at 100 characters
+MAX_CUSTOM_ID = 100
+
+# action -> (label, style)
+OWNERSHIP_ACTIONS = {
+    "yes": ("Owned", discord.ButtonStyle.success),
+    "no": ("Not Owned", discord.ButtonStyle.danger),
+    "cancel": ("Cancel", discord.ButtonStyle.grey),
+}
+
+
+def title_digest(title: str) -> str:
+    return hashlib.sha1(normalize_title(title).encode("utf-8")).hexdigest()[:16]
+
+
+class OwnershipButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"own:(?P<action>yes|no|cancel):(?P<year>\d+):(?P<key>.+)",
+):
+    """
+    One button of a /movie own card; the movie is encoded in its custom id.
+
+    The custom id is "own:<action>:<year>:<title>", or "#<digest>" instead of
+    the title when it wouldn't fit in 100 characters. Registered once with
+    `bot.add_dynamic_items`, so clicks on any card ever posted, including
+    ones from before a restart, are dispatched without a view in memory.
+    """
+
+    def __init__(self, action: str, year: int, key: str):
+        label, style = OWNERSHIP_ACTIONS[action]
+        super().__init__(
+            discord.ui.Button(
+                label=label, style=style, custom_id=f"own:{action}:{year}:{key}"
+            )
+        )
+        self.action = action
+        self.year = year
+        self.key = key
+
+    @classmethod
+    def for_movie(cls, action: str, title: str, year: int) -> "OwnershipButton":
+        key = title
+        if len(f"own:{action}:{year}:{key}") > MAX_CUSTOM_ID:
+            key = f"#{title_digest(title)}"
+        return cls(action, year, key)
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Button,
+        match: re.Match[str],
+    ) -> "OwnershipButton":
+        return cls(match["action"], int(match["year"]), match["key"])
+
+    async def title(self) -> Optional[str]:
+        if not self.key.startswith("#"):
+            return self.key
+        digest = self.key[1:]
+        # Every guild has the same titles, the shared catalog is enough
+        snapshot = await guild_catalogs.default.snapshot()
+        for movie in snapshot.movies:
+            if movie.year == self.year and title_digest(movie.title) == digest:
+                return movie.title
+        return None
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        if self.action == "cancel":
+            await interaction.response.send_message("Action Canceled.")
+            return
+        # The guild's catalog may have to be opened first, don't miss the deadline
+        await run_deferred(
+            interaction,
+            lambda: self.apply(interaction.guild_id),
+            name="movie own button",
+        )
+
+    async def apply(self, guild_id: Optional[int]) -> Reply:
+        title = await self.title()
+        collection = await guild_catalogs.get(guild_id)
+        if title is None:
+            result = "Movie not found."
+        elif self.action == "yes":
+            result = await collection.update_movie(title=title, year=self.year)
+        else:
+            result = await collection.mark_not_owned(title=title, year=self.year)
+        return {"content": result}
 
 
 class MovieUpdater(View):
+    """
+    The buttons of a /movie own card.
+
+    Only used to send the card: the view is stopped right away so discord.py
+    doesn't keep it, and clicks are handled by `OwnershipButton`.
+    """
+
     def __init__(self, title: str, year: int):
         super().__init__(timeout=None)
-        self.title = title
-        self.year = year
+        for action in OWNERSHIP_ACTIONS:
+            self.add_item(OwnershipButton.for_movie(action, title, year))
+        self.stop()
 
-    @discord.ui.button(label="Owned", style=discord.ButtonStyle.success)  # type: ignore
-    async def mark_owned(
-        self, interaction: discord.Interaction, button: discord.ui.Button
-    ):
-        result = update_movie(title=self.title, year=self.year)
-        await interaction.response.send_message(result)
 
-    @discord.ui.button(label="Not Owned", style=discord.ButtonStyle.danger)  # type: ignore
-    async def marked_not_owned(
-        self, interaction: discord.Interaction, button: discord.ui.Button
+class MoviePages:
+    """
+    Renders /movie list pages from the shared catalog.
+
+    Search results are kept per (query, catalog version) and rendered embeds
+    per (query, page, catalog version), both in small LRUs, so a popular list
+    such as the full catalog is searched and rendered once and then reused by
+    every open view. Any ownership change bumps the catalog version, so stale
+    pages simply stop being hit and age out.
+
+    Only a weak reference to the catalog is kept, so the pages of a guild
+    catalog go away together with it (see `pages_for`).
+    """
+
+    def __init__(
+        self,
+        catalog: MovieCatalog,
+        per_page: int = 20,
+        max_queries: int = 32,
+        max_pages: int = 128,
     ):
-        result = mark_not_owned(title=self.title, year=self.year)
-        await interaction.response.send_message(result)
+        self._catalog = weakref.ref(catalog)
+        self.per_page = per_page
+        self.max_queries = max_queries
+        self.max_pages = max_pages
+        self._results: "OrderedDict[Tuple[str, int], Tuple[Movie, ...]]" = OrderedDict()
+        self._pages: "OrderedDict[Tuple[str, int, int], discord.Embed]" = OrderedDict()
 
-    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.grey)
-    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        result = "Action Canceled."
-        await interaction.response.send_message(result)
+    @property
+    def catalog(self) -> MovieCatalog:
+        catalog = self._catalog()
+        if catalog is None:
+            raise RuntimeError("The catalog of these pages was closed.")
+        return catalog
 
+    @staticmethod
+    def _remember(cache: OrderedDict, key, value, limit: int) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
 
-class MovieView(View):
-    message: discord.Message | None
+    def results(self, query: str) -> Tuple[int, Tuple[Movie, ...]]:
+        """
+        The movies matching `query` and the catalog version they came from.
+        """
+        query = search_text(query)
+        version = self.catalog.version
+        cached = self._results.get((query, version))
+        if cached is not None:
+            self._results.move_to_end((query, version))
+            return version, cached
 
-    def __init__(self, movies, per_page=20):
-        super().__init__(timeout=300)
-        self.movies = movies
-        self.per_page = per_page
-        self.page = 0
+        version, movies = self.catalog.cached_search(query)
+        self._remember(self._results, (query, version), movies, self.max_queries)
+        return version, movies
 
-    async def on_timeout(self):
-        for child in self.children:
-            if isinstance(child, discord.ui.Button):
-                child.disabled = True
-            if self.message:
-                await self.message.edit(view=self)
+    def page_count(self, query: str) -> int:
+        _, movies = self.results(query)
+        return (len(movies) - 1) // self.per_page + 1 if movies else 0
 
-    def make_embed(self):
-        start = self.page * self.per_page
-        end = start + self.per_page
-        current_movies = self.movies[start:end]
+    def page_movies(self, query: str, page: int) -> Tuple[Movie, ...]:
+        _, movies = self.results(query)
+        return movies[page * self.per_page : (page + 1) * self.per_page]
+
+    def render(self, query: str, page: int) -> discord.Embed:
+        """
+        The embed for one page. Cached embeds are shared, don't modify them.
+        """
+        version, movies = self.results(query)
+        key = (search_text(query), page, version)
+        cached = self._pages.get(key)
+        if cached is not None:
+            self._pages.move_to_end(key)
+            return cached
+
+        current_movies = movies[page * self.per_page : (page + 1) * self.per_page]
 
         embed = discord.Embed(
-            title=f"Godzilla Movies (Page {self.page + 1}/{(len(self.movies) - 1) // self.per_page + 1})",
+            title=f"Godzilla Movies (Page {page + 1}/{(len(movies) - 1) // self.per_page + 1})",
             color=discord.Color.blurple(),
         )
 
         for movie in current_movies:
-            own = "✅" if movie["own"] == "Yes" else "❌"
+            own = "✅" if movie.own == "Yes" else "❌"
             embed.add_field(
-                name=f"{own} {movie['title']} ({movie['year']})",
+                name=f"{own} {movie.title} ({movie.year})",
                 value="",
                 inline=False,
             )
+
+        self._remember(self._pages, key, embed, self.max_pages)
         return embed
 
+
+# One per catalog, i.e. per guild collection, dropped with the catalog
+_pages: "weakref.WeakKeyDictionary[MovieCatalog, MoviePages]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def pages_for(catalog: MovieCatalog) -> MoviePages:
+    pages = _pages.get(catalog)
+    if pages is None:
+        pages = _pages[catalog] = MoviePages(catalog)
+    return pages
+
+
+def page_cache_sizes() -> Dict[str, int]:
+    """Cached search results and rendered pages across every catalog."""
+    return {
+        "catalogs": len(_pages),
+        "results": sum(len(p._results) for p in _pages.values()),
+        "pages": sum(len(p._pages) for p in _pages.values()),
+    }
+
+
+movie_pages = pages_for(catalog)
+
+
+class OwnershipSelect(discord.ui.Select["MovieView"]):
+    """
+    Multi-select of the movies on the current list page; the chosen ones are
+    marked owned (or not owned) together, in one catalog write.
+    """
+
+    def __init__(self, own: str, row: int):
+        super().__init__(
+            placeholder="Mark as owned..." if own == "Yes" else "Mark as not owned...",
+            row=row,
+        )
+        self.own = own
+        self.movies: List[Movie] = []
+        self.show([])
+
+    def show(self, movies: Tuple[Movie, ...]) -> None:
+        """Offer the movies on the page whose status this select would change."""
+        # Discord allows at most 25 options per select
+        self.movies = [m for m in movies if m.owned != (self.own == "Yes")][:25]
+        self.options = [
+            discord.SelectOption(label=f"{m.title} ({m.year})"[:100], value=str(i))
+            for i, m in enumerate(self.movies)
+        ] or [discord.SelectOption(label="Nothing to change", value="-")]
+        self.max_values = len(self.options)
+        self.disabled = not self.movies
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        view = self.view
+        assert view is not None and view.collection is not None
+        # The write can outlast Discord's 3 second deadline
+        await interaction.response.defer()
+        changes = [
+            OwnershipChange(
+                self.movies[int(v)].title, self.movies[int(v)].year, self.own
+            )
+            for v in self.values
+            if v != "-"
+        ]
+        results = await view.collection.set_ownership_many(changes)
+        view.show_page()
+        await interaction.edit_original_response(embed=view.make_embed(), view=view)
+        await interaction.followup.send(
+            BulkOwnershipReport(results).summary(), ephemeral=True
+        )
+
+
+class MovieView(View):
+    """
+    Paginated /movie list. Only the query and page number live here, the
+    movies and rendered pages come from the shared `MoviePages`.
+
+    With a `collection` to write to, two selects mark several movies on the
+    page as owned or not owned at once.
+    """
+
+    message: discord.Message | None
+
+    def __init__(
+        self,
+        query: str = "",
+        pages: MoviePages = movie_pages,
+        collection: Optional[AsyncMovieCatalog] = None,
+    ):
+        super().__init__(timeout=300)
+        self.query = query
+        self.pages = pages
+        self.collection = collection
+        self.page = 0
+        self.message = None
+        self.selects: List[OwnershipSelect] = []
+        if collection is not None:
+            self.selects = [OwnershipSelect("Yes", row=1), OwnershipSelect("No", row=2)]
+            for select in self.selects:
+                self.add_item(select)
+            self.show_page()
+
+    def show_page(self) -> None:
+        movies = self.pages.page_movies(self.query, self.page)
+        for select in self.selects:
+            select.show(movies)
+
+    async def on_timeout(self):
+        for child in self.children:
+            if isinstance(child, (discord.ui.Button, discord.ui.Select)):
+                child.disabled = True
+        if self.message:
+            await self.message.edit(view=self)
+
+    def make_embed(self):
+        return self.pages.render(self.query, self.page)
+
     @discord.ui.button(label="⬅️ Prev.", style=discord.ButtonStyle.secondary)
     async def prev_page(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
         if self.page > 0:
             self.page -= 1
+            self.show_page()
             await interaction.response.edit_message(embed=self.make_embed(), view=self)
 
     @discord.ui.button(label="➡️ next", style=discord.ButtonStyle.secondary)
     async def next_page(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        if (self.page + 1) * self.per_page < len(self.movies):
+        if self.page + 1 < self.pages.page_count(self.query):
             self.page += 1
+            self.show_page()
             await interaction.response.edit_message(embed=self.make_embed(), view=self)